@@ -1,17 +1,24 @@
 """
 Admin API endpoints for book management and task monitoring.
 """
+import asyncio
 import logging
 from typing import List, Optional
 from pathlib import Path
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status, Query
+from uuid import uuid4
+import aiofiles
+from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File, status, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_
+from sqlalchemy import select, func, delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from celery.result import AsyncResult
 
+from app.core.cache import cache_get, cache_set, cache_delete_pattern
+from app.core.config import settings
 from app.core.deps import get_current_admin_user, get_db
 from app.models.user import User
-from app.models.book import Book
+from app.models.book import Book, BookStatus
 from app.models.word import Word
 from app.models.celery_task import CeleryTask
 from app.schemas.book import (
@@ -27,24 +34,75 @@ from app.schemas.book import (
     WordCreate,
     WordUpdate,
     EnrichmentRequest,
-    EnrichmentResponse
+    EnrichmentResponse,
+    BOOK_LIST_ADAPTER,
+    WORD_LIST_ADAPTER
 )
 from app.tasks.pdf_tasks import process_pdf_book
 from app.tasks.ai_tasks import clean_ocr_data, batch_enrich_words
-from app.tasks import celery_app
+from app.tasks import celery_app, get_task_producer
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
+# Read uploads in 1 MiB chunks so memory stays flat regardless of file size
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Celery task states mapped to the status strings exposed by the API;
+# any other state is reported lower-cased
+TASK_STATE_MAP = {
+    "PENDING": "pending",
+    "PROGRESS": "processing",
+    "SUCCESS": "completed",
+    "FAILURE": "failed",
+}
+
+# Redis key prefixes for cached list_books / list_words totals
+BOOK_COUNT_CACHE_PREFIX = "admin:books:count:"
+WORD_COUNT_CACHE_PREFIX = "admin:words:count:"
+
+# Every PDF file starts with this header
+PDF_MAGIC = b"%PDF-"
+
+
+async def _stream_to_disk(
+    file: UploadFile,
+    file_path: Path,
+    first_chunk: bytes,
+    max_bytes: int
+) -> int:
+    """
+    Stream an upload to disk, aborting once it exceeds max_bytes.
+
+    Returns the number of bytes written.
+    """
+    written = 0
+    try:
+        async with aiofiles.open(file_path, "wb") as out:
+            chunk = first_chunk
+            while chunk:
+                written += len(chunk)
+                if written > max_bytes:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"File exceeds {settings.MAX_UPLOAD_SIZE_MB} MB limit"
+                    )
+                await out.write(chunk)
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+    except BaseException:
+        file_path.unlink(missing_ok=True)
+        raise
+
+    return written
+
 
 @router.post("/books/upload", response_model=BookUploadResponse)
 async def upload_book(
+    request: Request,
     file: UploadFile = File(...),
     title: str = Query(...),
     description: Optional[str] = Query(None),
-    author: Optional[str] = Query(None),
-    publisher: Optional[str] = Query(None),
     current_user: User = Depends(get_current_admin_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -53,8 +111,23 @@ async def upload_book(
 
     Requires admin role.
     """
-    # Validate file type
-    if not file.filename.endswith('.pdf'):
+    max_bytes = settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024
+
+    # Reject oversized uploads from the declared length, before reading the body
+    try:
+        content_length = int(request.headers.get("content-length", 0))
+    except ValueError:
+        content_length = 0
+
+    if content_length > max_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File exceeds {settings.MAX_UPLOAD_SIZE_MB} MB limit"
+        )
+
+    # Validate file type by its header rather than its name
+    first_chunk = await file.read(UPLOAD_CHUNK_SIZE)
+    if not first_chunk.startswith(PDF_MAGIC):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Only PDF files are allowed"
@@ -65,31 +138,60 @@ async def upload_book(
         upload_dir = Path("uploads") / "books"
         upload_dir.mkdir(parents=True, exist_ok=True)
 
-        # Save file
-        file_path = upload_dir / f"{file.filename}"
-        with open(file_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
+        # Save file (streamed to disk chunk by chunk). Only the basename of the
+        # client-supplied name is kept, prefixed to avoid collisions.
+        safe_name = Path(file.filename or "book.pdf").name
+        file_path = upload_dir / f"{uuid4().hex}_{safe_name}"
+
+        # Write the file while the book row is inserted; the row only becomes
+        # visible on commit, once the file has fully landed on disk
+        write_task = asyncio.create_task(
+            _stream_to_disk(file, file_path, first_chunk, max_bytes)
+        )
+
+        try:
+            # Create book record (file_size is set once the write is done)
+            new_book = Book(
+                title=title,
+                description=description,
+                file_url=str(file_path),
+                file_size=0,
+                status=BookStatus.PROCESSING,
+                total_pages=0,
+                total_words=0,
+                created_by=current_user.id
+            )
+            db.add(new_book)
+            await db.flush()
+        except BaseException:
+            write_task.cancel()
+            await asyncio.gather(write_task, return_exceptions=True)
+            # The write may have finished before the cancel
+            file_path.unlink(missing_ok=True)
+            raise
+
+        try:
+            written = await write_task
+        except BaseException:
+            # Nothing has been queued yet, so dropping the row is enough
+            await db.rollback()
+            raise
 
         logger.info(f"Saved uploaded file: {file_path}")
 
-        # Create book record
-        new_book = Book(
-            title=title,
-            description=description,
-            author=author,
-            publisher=publisher,
-            file_url=str(file_path),
-            status="processing",
-            total_pages=0,
-            total_words=0
-        )
-        db.add(new_book)
-        await db.commit()
-        await db.refresh(new_book)
+        try:
+            new_book.file_size = written
+            await db.commit()
+        except BaseException:
+            file_path.unlink(missing_ok=True)
+            raise
+        await cache_delete_pattern(f"{BOOK_COUNT_CACHE_PREFIX}*")
 
         # Start PDF processing task
-        task = process_pdf_book.delay(new_book.id, str(file_path))
+        task = process_pdf_book.apply_async(
+            (new_book.id, str(file_path)),
+            producer=get_task_producer()
+        )
 
         logger.info(f"Started PDF processing task {task.id} for book {new_book.id}")
 
@@ -102,6 +204,8 @@ async def upload_book(
             message="Book uploaded successfully. Processing started."
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error uploading book: {str(e)}")
         raise HTTPException(
@@ -124,47 +228,61 @@ async def list_books(
 
     Requires admin role.
     """
-    # Build query
-    query = select(Book)
-
-    # Apply filters
+    # Build filters
+    filters = []
     if status_filter:
-        query = query.where(Book.status == status_filter)
+        filters.append(Book.status == status_filter)
 
     if search:
-        query = query.where(
-            or_(
-                Book.title.ilike(f"%{search}%"),
-                Book.author.ilike(f"%{search}%"),
-                Book.publisher.ilike(f"%{search}%")
-            )
+        # Matches idx_books_title_trgm; books have no author/publisher columns
+        filters.append(Book.title.ilike(f"%{search}%"))
+
+    # Filtered totals are cached briefly so paging doesn't recount every time
+    count_key = f"{BOOK_COUNT_CACHE_PREFIX}{status_filter or ''}:{search or ''}"
+    cached_total = await cache_get(count_key)
+
+    if cached_total is not None:
+        # Total is known, so the page query can skip the window count
+        query = (
+            select(Book)
+            .where(*filters)
+            .order_by(Book.created_at.desc())
+            .offset(skip)
+            .limit(limit)
         )
-
-    # Get total count
-    count_query = select(func.count()).select_from(Book)
-    if status_filter:
-        count_query = count_query.where(Book.status == status_filter)
-    if search:
-        count_query = count_query.where(
-            or_(
-                Book.title.ilike(f"%{search}%"),
-                Book.author.ilike(f"%{search}%"),
-                Book.publisher.ilike(f"%{search}%")
-            )
+        result = await db.execute(query)
+        books = result.scalars().all()
+        total = int(cached_total)
+    else:
+        # The window count carries the filtered total on every row
+        query = (
+            select(Book, func.count().over().label("total"))
+            .where(*filters)
+            .order_by(Book.created_at.desc())
+            .offset(skip)
+            .limit(limit)
         )
+        result = await db.execute(query)
+        rows = result.all()
+        books = [row.Book for row in rows]
 
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
+        if rows:
+            total = rows[0].total
+        elif skip:
+            # Page is past the end, so no row carried the total
+            count_query = select(func.count()).select_from(Book).where(*filters)
+            total = (await db.execute(count_query)).scalar()
+        else:
+            total = 0
 
-    # Get books
-    query = query.offset(skip).limit(limit).order_by(Book.created_at.desc())
-    result = await db.execute(query)
-    books = result.scalars().all()
+        await cache_set(count_key, str(total), settings.ADMIN_COUNT_CACHE_TTL_SECONDS)
 
-    return BookListResponse(
-        total=total,
-        books=[BookInfo.model_validate(book) for book in books]
-    )
+    # Serialize once with orjson; returning a Response skips FastAPI's
+    # second response_model validation and json encoding pass
+    return ORJSONResponse({
+        "total": total,
+        "books": BOOK_LIST_ADAPTER.dump_python(BOOK_LIST_ADAPTER.validate_python(books, from_attributes=True))
+    })
 
 
 @router.get("/books/{book_id}", response_model=BookInfo)
@@ -245,17 +363,14 @@ async def delete_book(
             detail="Book not found"
         )
 
-    # Delete associated words
-    delete_words_stmt = select(Word).where(Word.book_id == book_id)
-    words_result = await db.execute(delete_words_stmt)
-    words = words_result.scalars().all()
-
-    for word in words:
-        await db.delete(word)
+    # Delete associated words in a single statement
+    await db.execute(delete(Word).where(Word.book_id == book_id))
 
     # Delete book
     await db.delete(book)
     await db.commit()
+    await cache_delete_pattern(f"{BOOK_COUNT_CACHE_PREFIX}*")
+    await cache_delete_pattern(f"{WORD_COUNT_CACHE_PREFIX}*")
 
     # Delete file
     try:
@@ -281,49 +396,29 @@ async def get_task_status(
     # Get task from Celery
     task = AsyncResult(task_id, app=celery_app)
 
+    # Fetch the backend meta once; task.state / task.info / task.result
+    # would each issue their own GET against the result backend. The Redis
+    # client is blocking, so run the lookup in a worker thread.
+    meta = await asyncio.to_thread(task._get_task_meta)
+    state = meta["status"]
+    info = meta.get("result")
+
     # Get task info from database
     # (This would require a database query, but for now we'll use Celery's result)
 
-    if task.state == "PENDING":
-        response = {
-            "task_id": task_id,
-            "status": "pending",
-            "progress": None,
-            "result": None,
-            "error_message": None
-        }
-    elif task.state == "PROGRESS":
-        response = {
-            "task_id": task_id,
-            "status": "processing",
-            "progress": task.info,
-            "result": None,
-            "error_message": None
-        }
-    elif task.state == "SUCCESS":
-        response = {
-            "task_id": task_id,
-            "status": "completed",
-            "progress": None,
-            "result": task.result,
-            "error_message": None
-        }
-    elif task.state == "FAILURE":
-        response = {
-            "task_id": task_id,
-            "status": "failed",
-            "progress": None,
-            "result": None,
-            "error_message": str(task.info)
-        }
-    else:
-        response = {
-            "task_id": task_id,
-            "status": task.state.lower(),
-            "progress": None,
-            "result": None,
-            "error_message": None
-        }
+    response = {
+        "task_id": task_id,
+        "status": TASK_STATE_MAP.get(state, state.lower()),
+        "progress": None,
+        "result": None,
+        "error_message": None
+    }
+    if state == "PROGRESS":
+        response["progress"] = info
+    elif state == "SUCCESS":
+        response["result"] = info
+    elif state == "FAILURE":
+        response["error_message"] = str(info)
 
     return TaskStatusResponse(**response)
 
@@ -342,35 +437,60 @@ async def list_words(
 
     Requires admin role.
     """
-    # Build query
-    query = select(Word)
-
-    # Apply filters
+    # Build filters
+    filters = []
     if book_id:
-        query = query.where(Word.book_id == book_id)
-
-    if search:
-        query = query.where(Word.spelling.ilike(f"%{search}%"))
+        filters.append(Word.book_id == book_id)
 
-    # Get total count
-    count_query = select(func.count()).select_from(Word)
-    if book_id:
-        count_query = count_query.where(Word.book_id == book_id)
     if search:
-        count_query = count_query.where(Word.spelling.ilike(f"%{search}%"))
+        filters.append(Word.spelling.ilike(f"%{search}%"))
+
+    # Filtered totals are cached briefly so paging doesn't recount every time
+    count_key = f"{WORD_COUNT_CACHE_PREFIX}{book_id or ''}:{search or ''}"
+    cached_total = await cache_get(count_key)
+
+    if cached_total is not None:
+        # Total is known, so the page query can skip the window count
+        query = (
+            select(Word)
+            .where(*filters)
+            .order_by(Word.spelling)
+            .offset(skip)
+            .limit(limit)
+        )
+        result = await db.execute(query)
+        words = result.scalars().all()
+        total = int(cached_total)
+    else:
+        # The window count carries the filtered total on every row
+        query = (
+            select(Word, func.count().over().label("total"))
+            .where(*filters)
+            .order_by(Word.spelling)
+            .offset(skip)
+            .limit(limit)
+        )
+        result = await db.execute(query)
+        rows = result.all()
+        words = [row.Word for row in rows]
 
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
+        if rows:
+            total = rows[0].total
+        elif skip:
+            # Page is past the end, so no row carried the total
+            count_query = select(func.count()).select_from(Word).where(*filters)
+            total = (await db.execute(count_query)).scalar()
+        else:
+            total = 0
 
-    # Get words
-    query = query.offset(skip).limit(limit).order_by(Word.spelling)
-    result = await db.execute(query)
-    words = result.scalars().all()
+        await cache_set(count_key, str(total), settings.ADMIN_COUNT_CACHE_TTL_SECONDS)
 
-    return WordListResponse(
-        total=total,
-        words=[WordInfo.model_validate(word) for word in words]
-    )
+    # Serialize once with orjson; returning a Response skips FastAPI's
+    # second response_model validation and json encoding pass
+    return ORJSONResponse({
+        "total": total,
+        "words": WORD_LIST_ADAPTER.dump_python(WORD_LIST_ADAPTER.validate_python(words, from_attributes=True))
+    })
 
 
 @router.post("/words", response_model=WordInfo)
@@ -384,19 +504,8 @@ async def create_word(
 
     Requires admin role.
     """
-    # Check if word already exists
-    stmt = select(Word).where(Word.spelling == word_data.spelling.lower())
-    result = await db.execute(stmt)
-    existing_word = result.scalar_one_or_none()
-
-    if existing_word:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Word already exists"
-        )
-
-    # Create word
-    new_word = Word(
+    # Insert the word; ON CONFLICT replaces the separate existence check
+    stmt = pg_insert(Word).values(
         spelling=word_data.spelling.lower(),
         phonetic=word_data.phonetic,
         definitions=word_data.definitions,
@@ -406,11 +515,19 @@ async def create_word(
         audio_url=word_data.audio_url,
         tags=word_data.tags or [],
         book_id=word_data.book_id
-    )
+    ).on_conflict_do_nothing(index_elements=["spelling"]).returning(Word)
+
+    result = await db.execute(stmt)
+    new_word = result.scalar_one_or_none()
+
+    if new_word is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Word already exists"
+        )
 
-    db.add(new_word)
     await db.commit()
-    await db.refresh(new_word)
+    await cache_delete_pattern(f"{WORD_COUNT_CACHE_PREFIX}*")
 
     return WordInfo.model_validate(new_word)
 
@@ -471,6 +588,7 @@ async def delete_word(
 
     await db.delete(word)
     await db.commit()
+    await cache_delete_pattern(f"{WORD_COUNT_CACHE_PREFIX}*")
 
     return {"message": "Word deleted successfully"}
 
@@ -489,14 +607,20 @@ async def enrich_words(
     if request.word_ids:
         # Enrich specific words
         total_words = len(request.word_ids)
-        task = batch_enrich_words.delay(None, request.word_ids)
+        task = batch_enrich_words.apply_async(
+            (None, request.word_ids),
+            producer=get_task_producer()
+        )
     elif request.book_id:
         # Enrich all words in a book
         stmt = select(func.count()).select_from(Word).where(Word.book_id == request.book_id)
         result = await db.execute(stmt)
         total_words = result.scalar()
 
-        task = batch_enrich_words.delay(request.book_id)
+        task = batch_enrich_words.apply_async(
+            (request.book_id,),
+            producer=get_task_producer()
+        )
     else:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
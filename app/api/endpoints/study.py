@@ -1,25 +1,72 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func
-from datetime import datetime
+from sqlalchemy import select, and_, or_, func, exists
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from datetime import datetime, timedelta
 from typing import List, Optional
 from uuid import uuid4
-from app.core.database import get_db
+import asyncio
+from app.core.database import get_db, AsyncSessionLocal
 from app.core.deps import get_current_active_user
 from app.models.user import User
 from app.models.word import Word
-from app.models.user_progress import UserProgress
+from app.models.user_progress import UserProgress, HISTORY_RING_SIZE, HISTORY_RING_FILLED
+from app.models.user_progress_stats import UserProgressStats
+from app.models.user_progress_history import user_study_stats_mv
 from app.models.user_study_plan import UserStudyPlan
 from app.schemas.study import (
     StudySessionResponse,
     StudySubmitRequest,
     StudySubmitResponse,
+    StudySubmitBatchRequest,
+    StudySubmitBatchResponse,
     StudyStatsResponse,
 )
 from app.services.sm2_algorithm import SM2Algorithm
 
 router = APIRouter(prefix="/study", tags=["Study"])
 
+# 统计周期对应的天数 (None 表示全部)
+STATS_PERIOD_DAYS = {"day": 1, "week": 7, "month": 30, "all": None}
+
+
+async def _aggregate_progress_stats(db: AsyncSession, user_id: int) -> tuple:
+    """
+    实时聚合用户的学习统计
+
+    Returns:
+        (total_words, mastered, learning, new, correct_total, review_total)
+    """
+    stats_query = select(
+        func.count(),
+        func.count().filter(UserProgress.status == 3),
+        func.count().filter(UserProgress.status.in_([1, 2])),
+        func.count().filter(UserProgress.status == 0),
+        func.sum(UserProgress.correct_count),
+        func.sum(UserProgress.total_reviews)
+    ).where(UserProgress.user_id == user_id)
+    stats_result = await db.execute(stats_query)
+    return tuple(stats_result.one())
+
+
+async def _get_active_plan(user_id: int) -> Optional[UserStudyPlan]:
+    """
+    获取用户激活的学习计划
+
+    使用独立的会话 (同一连接池), 以便与请求会话上的查询并发执行
+    """
+    active_plan_query = select(UserStudyPlan).where(
+        and_(
+            UserStudyPlan.user_id == user_id,
+            UserStudyPlan.is_active == True
+        )
+    ).limit(1)
+
+    async with AsyncSessionLocal() as session:
+        active_plan_result = await session.execute(active_plan_query)
+        return active_plan_result.scalar_one_or_none()
+
 
 @router.get("/session", response_model=StudySessionResponse)
 async def get_study_session(
@@ -35,22 +82,42 @@ async def get_study_session(
     """
     session_id = str(uuid4())
     words_data = []
+    review_count = 0
+    new_count = 0
 
     # 1. 获取待复习的单词
-    review_query = select(UserProgress, Word).join(
+    # total_due 通过窗口函数随结果一并返回, 省去单独的 count 查询
+    review_query = select(
+        UserProgress, Word, func.count().over().label("total_due")
+    ).join(
         Word, UserProgress.word_id == Word.id
     ).where(
         and_(
             UserProgress.user_id == current_user.id,
-            UserProgress.next_review_at <= datetime.utcnow(),
+            UserProgress.next_review_at <= func.now(),  # 由数据库求值, 避免应用节点时钟偏差
             UserProgress.status < 3  # 未掌握的单词
         )
     ).order_by(UserProgress.next_review_at.asc()).limit(limit)
 
-    review_result = await db.execute(review_query)
+    # 复习查询与学习计划查询相互独立, 分别在两个连接上并发执行
+    if include_new:
+        review_result, active_plan = await asyncio.gather(
+            db.execute(review_query),
+            _get_active_plan(current_user.id)
+        )
+    else:
+        review_result = await db.execute(review_query)
+        active_plan = None
+
     review_items = review_result.all()
+    total_due = review_items[0].total_due if review_items else 0
+
+    for progress, word, _ in review_items:
+        if progress.status > 0:
+            review_count += 1
+        else:
+            new_count += 1
 
-    for progress, word in review_items:
         words_data.append({
             "word_id": word.id,
             "spelling": word.spelling,
@@ -72,35 +139,26 @@ async def get_study_session(
     if include_new and len(words_data) < limit:
         remaining = limit - len(words_data)
 
-        # 获取用户激活的学习计划
-        active_plan_query = select(UserStudyPlan).where(
-            and_(
-                UserStudyPlan.user_id == current_user.id,
-                UserStudyPlan.is_active == True
-            )
-        ).limit(1)
-
-        active_plan_result = await db.execute(active_plan_query)
-        active_plan = active_plan_result.scalar_one_or_none()
-
         if active_plan:
-            # 获取该词书中用户未学习的单词
-            learned_word_ids_query = select(UserProgress.word_id).where(
-                UserProgress.user_id == current_user.id
+            # 获取该词书中用户未学习的单词 (NOT EXISTS 在数据库端完成过滤)
+            learned = exists().where(
+                and_(
+                    UserProgress.user_id == current_user.id,
+                    UserProgress.word_id == Word.id
+                )
             )
-            learned_word_ids_result = await db.execute(learned_word_ids_query)
-            learned_word_ids = [row[0] for row in learned_word_ids_result.all()]
 
             new_words_query = select(Word).where(
                 and_(
                     Word.book_id == active_plan.book_id,
-                    Word.id.notin_(learned_word_ids) if learned_word_ids else True
+                    ~learned
                 )
             ).limit(remaining)
 
             new_words_result = await db.execute(new_words_query)
             new_words = new_words_result.scalars().all()
 
+            new_count += len(new_words)
             for word in new_words:
                 words_data.append({
                     "word_id": word.id,
@@ -119,29 +177,17 @@ async def get_study_session(
                     }
                 })
 
-    # 3. 统计信息
-    total_due_query = select(func.count(UserProgress.id)).where(
-        and_(
-            UserProgress.user_id == current_user.id,
-            UserProgress.next_review_at <= datetime.utcnow(),
-            UserProgress.status < 3
-        )
-    )
-    total_due_result = await db.execute(total_due_query)
-    total_due = total_due_result.scalar()
-
-    review_words = len([w for w in words_data if w["progress"]["status"] > 0])
-    new_words = len([w for w in words_data if w["progress"]["status"] == 0])
-
-    return StudySessionResponse(
-        session_id=session_id,
-        words=words_data,
-        stats={
+    # 3. 统计信息 (计数已在构建 words_data 时累计)
+    # words_data 已是可直接序列化的字典, 直接交给 orjson, 跳过 response_model 的校验与编码
+    return ORJSONResponse({
+        "session_id": session_id,
+        "words": words_data,
+        "stats": {
             "total_due": total_due,
-            "new_words": new_words,
-            "review_words": review_words,
+            "new_words": new_count,
+            "review_words": review_count,
         }
-    )
+    })
 
 
 @router.post("/submit", response_model=StudySubmitResponse)
@@ -155,133 +201,273 @@ async def submit_study_result(
 
     使用 SM-2 算法计算下次复习时间
     """
-    # 查找或创建用户进度记录
-    progress_query = select(UserProgress).where(
+    now = datetime.utcnow()
+
+    # 读取上一次的 SM-2 参数 (新单词使用默认值)
+    progress_query = select(
+        UserProgress.status,
+        UserProgress.ease_factor,
+        UserProgress.interval,
+        UserProgress.repetitions
+    ).where(
         and_(
             UserProgress.user_id == current_user.id,
             UserProgress.word_id == submit_data.word_id
         )
     )
     progress_result = await db.execute(progress_query)
-    progress = progress_result.scalar_one_or_none()
+    progress = progress_result.one_or_none()
 
     if progress is None:
-        # 创建新的进度记录
-        progress = UserProgress(
-            user_id=current_user.id,
-            word_id=submit_data.word_id,
-            status=0,
-            ease_factor=2.5,
-            interval=0,
-            repetitions=0,
-            total_reviews=0,
-            correct_count=0,
-            history=[]
-        )
-        db.add(progress)
+        prev_status, prev_ease_factor, prev_interval, prev_repetitions = 0, 2.5, 0, 0
+    else:
+        prev_status, prev_ease_factor, prev_interval, prev_repetitions = progress
 
     # 使用 SM-2 算法计算新参数
     new_interval, new_ease_factor, new_repetitions, next_review_at = SM2Algorithm.calculate_next_review(
         quality=submit_data.quality,
-        prev_interval=progress.interval,
-        prev_ease_factor=progress.ease_factor,
-        prev_repetitions=progress.repetitions
+        prev_interval=prev_interval,
+        prev_ease_factor=prev_ease_factor,
+        prev_repetitions=prev_repetitions,
+        now=now
     )
 
     # 更新状态
-    new_status = SM2Algorithm.get_status_from_quality(submit_data.quality, progress.status)
-
-    # 更新进度记录
-    progress.status = new_status
-    progress.next_review_at = next_review_at
-    progress.ease_factor = new_ease_factor
-    progress.interval = new_interval
-    progress.repetitions = new_repetitions
-    progress.last_review_at = datetime.utcnow()
-    progress.total_reviews += 1
-
-    if submit_data.quality >= 3:
-        progress.correct_count += 1
-
-    # 记录历史
-    history_entry = {
-        "timestamp": datetime.utcnow().isoformat(),
-        "quality": submit_data.quality,
-        "time_spent": submit_data.time_spent,
-        "interval": new_interval,
-        "ease_factor": new_ease_factor,
-    }
-
-    if progress.history is None:
-        progress.history = []
-    progress.history.append(history_entry)
-
+    new_status = SM2Algorithm.get_status_from_quality(submit_data.quality, prev_status)
+
+    # 单条 UPSERT 写入进度记录, RETURNING 直接取回结果 (无需 refresh)
+    upsert_stmt = _progress_upsert([
+        _progress_values(
+            current_user.id,
+            submit_data.word_id,
+            submit_data.quality,
+            submit_data.time_spent,
+            new_status,
+            next_review_at,
+            new_ease_factor,
+            new_interval,
+            new_repetitions
+        )
+    ])
+    upsert_result = await db.execute(upsert_stmt)
+    saved = upsert_result.one()
     await db.commit()
-    await db.refresh(progress)
 
     return StudySubmitResponse(
-        next_review_at=progress.next_review_at,
-        interval=progress.interval,
-        ease_factor=progress.ease_factor,
-        status=progress.status
+        next_review_at=saved.next_review_at,
+        interval=saved.interval,
+        ease_factor=saved.ease_factor,
+        status=saved.status
     )
 
 
-@router.get("/stats", response_model=StudyStatsResponse)
-async def get_study_stats(
-    period: str = Query("week", regex="^(day|week|month|all)$"),
+@router.post("/submit/batch", response_model=StudySubmitBatchResponse)
+async def submit_study_results_batch(
+    submit_data: StudySubmitBatchRequest,
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    获取学习统计
-    """
-    # 统计各状态的单词数量
-    total_query = select(func.count(UserProgress.id)).where(
-        UserProgress.user_id == current_user.id
-    )
-    total_result = await db.execute(total_query)
-    total_words = total_result.scalar() or 0
+    批量提交学习结果 (如离线复习后一次性同步)
 
-    mastered_query = select(func.count(UserProgress.id)).where(
-        and_(
-            UserProgress.user_id == current_user.id,
-            UserProgress.status == 3
+    一次查询读取全部单词的 SM-2 参数, 向量化计算后用一条多行 UPSERT 写回
+    """
+    items = submit_data.results
+    word_ids = [item.word_id for item in items]
+    if len(set(word_ids)) != len(word_ids):
+        # 同一行在一条 UPSERT 中不能被更新两次
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Each word can only be submitted once per batch"
         )
-    )
-    mastered_result = await db.execute(mastered_query)
-    mastered = mastered_result.scalar() or 0
 
-    learning_query = select(func.count(UserProgress.id)).where(
+    now = datetime.utcnow()
+
+    # 读取上一次的 SM-2 参数 (新单词使用默认值)
+    progress_query = select(
+        UserProgress.word_id,
+        UserProgress.status,
+        UserProgress.ease_factor,
+        UserProgress.interval,
+        UserProgress.repetitions
+    ).where(
         and_(
             UserProgress.user_id == current_user.id,
-            UserProgress.status.in_([1, 2])
+            UserProgress.word_id.in_(word_ids)
         )
     )
-    learning_result = await db.execute(learning_query)
-    learning = learning_result.scalar() or 0
+    progress_result = await db.execute(progress_query)
+    prev_by_word = {row.word_id: tuple(row)[1:] for row in progress_result}
+    prev = [prev_by_word.get(word_id, (0, 2.5, 0, 0)) for word_id in word_ids]
+
+    # 使用 SM-2 算法批量计算新参数
+    new_intervals, new_ease_factors, new_repetitions, next_review_ats = SM2Algorithm.calculate_next_review_batch(
+        qualities=[item.quality for item in items],
+        prev_intervals=[p[2] for p in prev],
+        prev_ease_factors=[p[1] for p in prev],
+        prev_repetitions=[p[3] for p in prev],
+        now=now
+    )
 
-    new_query = select(func.count(UserProgress.id)).where(
-        and_(
-            UserProgress.user_id == current_user.id,
-            UserProgress.status == 0
+    upsert_stmt = _progress_upsert([
+        _progress_values(
+            current_user.id,
+            item.word_id,
+            item.quality,
+            item.time_spent,
+            SM2Algorithm.get_status_from_quality(item.quality, prev_status),
+            next_review_at,
+            ease_factor,
+            interval,
+            repetitions
+        )
+        for item, (prev_status, *_), interval, ease_factor, repetitions, next_review_at in zip(
+            items,
+            prev,
+            new_intervals.tolist(),
+            new_ease_factors.tolist(),
+            new_repetitions.tolist(),
+            next_review_ats.tolist()
         )
+    ]).returning(UserProgress.word_id)
+    upsert_result = await db.execute(upsert_stmt)
+    saved_by_word = {row.word_id: row for row in upsert_result}
+    await db.commit()
+
+    return StudySubmitBatchResponse(results=[
+        {
+            "word_id": word_id,
+            "next_review_at": saved_by_word[word_id].next_review_at,
+            "interval": saved_by_word[word_id].interval,
+            "ease_factor": saved_by_word[word_id].ease_factor,
+            "status": saved_by_word[word_id].status,
+        }
+        for word_id in word_ids
+    ])
+
+
+def _progress_values(
+    user_id: int,
+    word_id: int,
+    quality: int,
+    time_spent: float,
+    new_status: int,
+    next_review_at: datetime,
+    ease_factor: float,
+    interval: int,
+    repetitions: int
+) -> dict:
+    """一次复习结果对应的 user_progress 插入值 (首次学习时即为整行)"""
+    correct_increment = 1 if quality >= 3 else 0
+
+    # 记录历史: 评分写入环形缓冲区 (完整记录由触发器归档)
+    ring_byte = HISTORY_RING_FILLED | quality
+
+    return {
+        "user_id": user_id,
+        "word_id": word_id,
+        "status": new_status,
+        "next_review_at": next_review_at,
+        "ease_factor": ease_factor,
+        "interval": interval,
+        "repetitions": repetitions,
+        "last_review_at": func.now(),
+        "total_reviews": 1,
+        "correct_count": correct_increment,
+        "last_quality": quality,
+        "last_time_spent": time_spent,
+        "recent_correct_mask": correct_increment,
+        "history_ring": bytes([ring_byte]) + bytes(HISTORY_RING_SIZE - 1),
+        "history_head": 1,
+    }
+
+
+def _progress_upsert(rows: List[dict]):
+    """
+    写入复习结果的 UPSERT (单行或多行), RETURNING 新的调度参数
+
+    已有记录时, 计数在原值上累加 (插入值即本次增量), 本次评分从插入值中取回
+    """
+    insert_stmt = pg_insert(UserProgress).values(rows)
+    return insert_stmt.on_conflict_do_update(
+        index_elements=["user_id", "word_id"],
+        set_={
+            "status": insert_stmt.excluded.status,
+            "next_review_at": insert_stmt.excluded.next_review_at,
+            "ease_factor": insert_stmt.excluded.ease_factor,
+            "interval": insert_stmt.excluded.interval,
+            "repetitions": insert_stmt.excluded.repetitions,
+            "last_review_at": insert_stmt.excluded.last_review_at,
+            "total_reviews": UserProgress.total_reviews + 1,
+            "correct_count": UserProgress.correct_count + insert_stmt.excluded.correct_count,
+            "last_quality": insert_stmt.excluded.last_quality,
+            "last_time_spent": insert_stmt.excluded.last_time_spent,
+            # 位图左移一位后记入本次结果 (bigint 移位不做溢出检查, 最早的结果自然移出)
+            "recent_correct_mask": UserProgress.recent_correct_mask.op("<<")(1).op("|")(
+                insert_stmt.excluded.recent_correct_mask
+            ),
+            # 在数据库端覆盖 head 位置的字节并后移 head (SET 右侧均取更新前的值)
+            "history_ring": func.set_byte(
+                UserProgress.history_ring,
+                UserProgress.history_head,
+                insert_stmt.excluded.last_quality.op("|")(HISTORY_RING_FILLED)
+            ),
+            "history_head": (UserProgress.history_head + 1) % HISTORY_RING_SIZE,
+            "updated_at": func.now(),
+        }
+    ).returning(
+        UserProgress.next_review_at,
+        UserProgress.interval,
+        UserProgress.ease_factor,
+        UserProgress.status
     )
-    new_result = await db.execute(new_query)
-    new = new_result.scalar() or 0
+
+
+@router.get("/stats", response_model=StudyStatsResponse)
+async def get_study_stats(
+    period: str = Query("week", regex="^(day|week|month|all)$"),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    获取学习统计
+    """
+    # 优先读取触发器维护的汇总行 (主键查询)
+    summary_query = select(
+        UserProgressStats.total_words,
+        UserProgressStats.mastered,
+        UserProgressStats.learning,
+        UserProgressStats.new_words,
+        UserProgressStats.correct_count,
+        UserProgressStats.total_reviews
+    ).where(UserProgressStats.user_id == current_user.id)
+    summary_result = await db.execute(summary_query)
+    summary = summary_result.one_or_none()
+
+    if summary is None:
+        # 汇总行不存在时回退为实时聚合 (单次扫描完成全部聚合)
+        summary = await _aggregate_progress_stats(db, current_user.id)
+
+    total_words, mastered, learning, new, correct_total, review_total = summary
 
     # 计算准确率
     accuracy_rate = 0.0
-    if total_words > 0:
-        accuracy_query = select(
-            func.sum(UserProgress.correct_count),
-            func.sum(UserProgress.total_reviews)
-        ).where(UserProgress.user_id == current_user.id)
-        accuracy_result = await db.execute(accuracy_query)
-        correct_total, review_total = accuracy_result.one()
-
-        if review_total and review_total > 0:
-            accuracy_rate = correct_total / review_total
+    if review_total and review_total > 0:
+        accuracy_rate = correct_total / review_total
+
+    # 图表数据读取按天预聚合的物化视图 (定时刷新, 可能有几分钟延迟)
+    daily_query = select(
+        user_study_stats_mv.c.review_date,
+        user_study_stats_mv.c.reviews,
+        user_study_stats_mv.c.correct,
+        user_study_stats_mv.c.time_spent
+    ).where(user_study_stats_mv.c.user_id == current_user.id)
+    period_days = STATS_PERIOD_DAYS[period]
+    if period_days is not None:
+        since = datetime.utcnow().date() - timedelta(days=period_days - 1)
+        daily_query = daily_query.where(user_study_stats_mv.c.review_date >= since)
+    daily_result = await db.execute(daily_query.order_by(user_study_stats_mv.c.review_date))
+    daily_rows = daily_result.all()
 
     return StudyStatsResponse(
         total_words=total_words,
@@ -290,10 +476,10 @@ async def get_study_stats(
         new=new,
         daily_streak=0,  # TODO: 实现连续学习天数统计
         accuracy_rate=accuracy_rate,
-        time_spent_minutes=0,  # TODO: 实现学习时长统计
+        time_spent_minutes=int(sum(row.time_spent for row in daily_rows) // 60),
         chart_data={
-            "dates": [],
-            "reviews": [],
-            "accuracy": [],
+            "dates": [row.review_date.isoformat() for row in daily_rows],
+            "reviews": [row.reviews for row in daily_rows],
+            "accuracy": [row.correct / row.reviews for row in daily_rows],
         }
     )
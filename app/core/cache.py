@@ -0,0 +1,62 @@
+"""
+Redis-backed cache helpers for the API process.
+
+Cache failures are logged and treated as misses, so Redis being unavailable
+never fails a request.
+"""
+import logging
+from typing import Optional
+import redis.asyncio as aioredis
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Connections are opened lazily on first use
+redis_client = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+
+
+async def cache_get(key: str) -> Optional[str]:
+    """
+    Get a cached value.
+
+    Args:
+        key: Cache key
+
+    Returns:
+        Cached value, or None on a miss or cache error
+    """
+    try:
+        return await redis_client.get(key)
+    except Exception as e:
+        logger.warning(f"Cache get failed for {key}: {str(e)}")
+        return None
+
+
+async def cache_set(key: str, value: str, ttl: int) -> None:
+    """
+    Store a value with an expiry.
+
+    Args:
+        key: Cache key
+        value: Value to store
+        ttl: Time to live in seconds
+    """
+    try:
+        await redis_client.setex(key, ttl, value)
+    except Exception as e:
+        logger.warning(f"Cache set failed for {key}: {str(e)}")
+
+
+async def cache_delete_pattern(pattern: str) -> None:
+    """
+    Delete all keys matching a glob pattern.
+
+    Args:
+        pattern: Redis glob pattern (e.g. "admin:books:count:*")
+    """
+    try:
+        keys = [key async for key in redis_client.scan_iter(match=pattern)]
+        if keys:
+            await redis_client.delete(*keys)
+    except Exception as e:
+        logger.warning(f"Cache delete failed for {pattern}: {str(e)}")
@@ -1,13 +1,49 @@
+from uuid import uuid4
+import orjson
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import NullPool
 from app.core.config import settings
 
+
+def _json_serializer(value) -> str:
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+if settings.DB_PGBOUNCER:
+    # pgbouncer owns the pool, and in transaction mode consecutive statements
+    # may land on different server connections, so prepared statements can't
+    # be cached and each one needs a unique name
+    _pool_args = {"poolclass": NullPool}
+    _connect_args = {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+    }
+else:
+    _pool_args = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    _connect_args = {
+        # asyncpg server-side prepared statements, and SQLAlchemy's
+        # per-connection cache of them
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+    }
+
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,
-    pool_size=10,
-    max_overflow=20,
-    pool_pre_ping=True,
+    # JSON/JSONB columns are encoded/decoded with orjson; the asyncpg dialect
+    # registers these codecs once per pooled connection
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
+    connect_args=_connect_args,
+    **_pool_args,
 )
 
 AsyncSessionLocal = async_sessionmaker(
@@ -35,4 +71,6 @@ async def get_db() -> AsyncSession:
 
 async def init_db():
     async with engine.begin() as conn:
+        # Required by the gin_trgm_ops search indexes
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         await conn.run_sync(Base.metadata.create_all)
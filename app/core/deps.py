@@ -1,20 +1,50 @@
+import time
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.orm import make_transient_to_detached
 from typing import Optional
+from cachetools import TTLCache
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.security import decode_token
 from app.models.user import User, UserRole
 
 security = HTTPBearer()
 
+# Short-lived cache of authenticated users keyed by the raw access token, so
+# repeated requests with the same token skip the user SELECT. Entries hold
+# plain values, (user_id, role, is_active, token exp), never ORM objects;
+# they are not used past exp, so an expired token is still rejected. Role or
+# is_active changes take effect once the entry expires.
+_user_cache: Optional[TTLCache] = (
+    TTLCache(maxsize=10_000, ttl=settings.AUTH_USER_CACHE_TTL_SECONDS)
+    if settings.AUTH_USER_CACHE_TTL_SECONDS > 0
+    else None
+)
+
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db)
 ) -> User:
     token = credentials.credentials
+
+    if _user_cache is not None:
+        cached = _user_cache.get(token)
+        if cached is not None:
+            user_id, role, is_active, exp = cached
+            if exp is None or time.time() < exp:
+                if not is_active:
+                    raise HTTPException(
+                        status_code=status.HTTP_403_FORBIDDEN,
+                        detail="Inactive user",
+                    )
+                return await _attach_user(db, user_id, role, is_active)
+            # Expired since it was cached: decode_token below rejects it
+            _user_cache.pop(token, None)
+
     payload = decode_token(token)
 
     if payload is None:
@@ -60,9 +90,24 @@ async def get_current_user(
             detail="Inactive user",
         )
 
+    if _user_cache is not None:
+        _user_cache[token] = (user.id, user.role, user.is_active, payload.get("exp"))
+
     return user
 
 
+async def _attach_user(db: AsyncSession, user_id: int, role: UserRole, is_active: bool) -> User:
+    """
+    Put a User built from cached values into the request's session, without a SELECT.
+
+    Only id, role and is_active are loaded; the other columns are expired,
+    so load them with ``await db.refresh(user)`` before reading them.
+    """
+    user = User(id=user_id, role=role, is_active=is_active)
+    make_transient_to_detached(user)
+    return await db.merge(user, load=False)
+
+
 async def get_current_active_user(
     current_user: User = Depends(get_current_user),
 ) -> User:
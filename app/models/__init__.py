@@ -2,6 +2,8 @@ from app.models.user import User
 from app.models.book import Book
 from app.models.word import Word
 from app.models.user_progress import UserProgress
+from app.models.user_progress_stats import UserProgressStats
+from app.models.user_progress_history import UserProgressHistory
 from app.models.user_study_plan import UserStudyPlan
 from app.models.user_feedback import UserFeedback
 from app.models.celery_task import CeleryTask
@@ -11,6 +13,8 @@ __all__ = [
     "Book",
     "Word",
     "UserProgress",
+    "UserProgressStats",
+    "UserProgressHistory",
     "UserStudyPlan",
     "UserFeedback",
     "CeleryTask",
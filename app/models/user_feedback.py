@@ -1,20 +1,21 @@
-from sqlalchemy import Column, BigInteger, Integer, Text, DateTime, Enum as SQLEnum, ForeignKey
+from sqlalchemy import Column, BigInteger, Integer, SmallInteger, Text, DateTime, ForeignKey, CheckConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
 from app.core.database import Base
 
 
-class FeedbackType(str, enum.Enum):
-    HELPFUL = "helpful"
-    INCORRECT = "incorrect"
-    INAPPROPRIATE = "inappropriate"
+# Stored as SMALLINT: adding a member needs no ALTER TYPE, and the CHECK ranges below follow the enums
+class FeedbackType(enum.IntEnum):
+    HELPFUL = 1
+    INCORRECT = 2
+    INAPPROPRIATE = 3
 
 
-class ContentType(str, enum.Enum):
-    DEFINITION = "definition"
-    SENTENCE = "sentence"
-    MNEMONIC = "mnemonic"
+class ContentType(enum.IntEnum):
+    DEFINITION = 1
+    SENTENCE = 2
+    MNEMONIC = 3
 
 
 class UserFeedback(Base):
@@ -23,10 +24,25 @@ class UserFeedback(Base):
     id = Column(BigInteger, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     word_id = Column(Integer, ForeignKey("words.id"), nullable=False)
-    feedback_type = Column(SQLEnum(FeedbackType), nullable=False)
-    content_type = Column(SQLEnum(ContentType), nullable=False)
+    feedback_type = Column(SmallInteger, nullable=False)
+    content_type = Column(SmallInteger, nullable=False)
     comment = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
+    # Related rows must be loaded explicitly (join / selectinload); lazy access raises
+    user = relationship("User", lazy="raise")
+    word = relationship("Word", lazy="raise")
+
+    __table_args__ = (
+        CheckConstraint(
+            f"feedback_type BETWEEN {min(FeedbackType)} AND {max(FeedbackType)}",
+            name='ck_feedback_type_range'
+        ),
+        CheckConstraint(
+            f"content_type BETWEEN {min(ContentType)} AND {max(ContentType)}",
+            name='ck_feedback_content_type_range'
+        ),
+    )
+
     def __repr__(self):
         return f"<UserFeedback(id={self.id}, user_id={self.user_id}, word_id={self.word_id})>"
@@ -1,33 +1,77 @@
-from sqlalchemy import Column, BigInteger, Integer, Float, DateTime, ForeignKey, Index
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import Column, BigInteger, Integer, SmallInteger, Float, DateTime, ForeignKey, Index, LargeBinary, DDL, event, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
 
+# 行内保留的最近复习评分个数 (环形缓冲区字节数)
+HISTORY_RING_SIZE = 64
+# 评分字节的最高位标记该槽位已写入, 低位为评分 0-5
+HISTORY_RING_FILLED = 0x80
+# 按 user_id 哈希分区的分区数 (同一用户的进度行始终落在同一分区)
+PARTITION_COUNT = 16
+
+
 class UserProgress(Base):
     __tablename__ = "user_progress"
 
-    id = Column(BigInteger, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # 分区表的主键必须包含分区键, 因此主键为 (id, user_id)
+    id = Column(BigInteger, primary_key=True, autoincrement=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
     word_id = Column(Integer, ForeignKey("words.id"), nullable=False)
     status = Column(Integer, default=0, nullable=False)
-    next_review_at = Column(DateTime(timezone=True), nullable=True)
+    next_review_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=True)
     ease_factor = Column(Float, default=2.5, nullable=False)
     interval = Column(Integer, default=0, nullable=False)
     repetitions = Column(Integer, default=0, nullable=False)
     last_review_at = Column(DateTime(timezone=True), nullable=True)
     total_reviews = Column(Integer, default=0, nullable=False)
     correct_count = Column(Integer, default=0, nullable=False)
-    history = Column(JSONB, default=list, nullable=False)
+    # 最近一次复习的常用字段放在独立列中, 统计时无需展开 history
+    last_quality = Column(SmallInteger, nullable=True)
+    last_time_spent = Column(Float, nullable=True)
+    # 最近 64 次复习结果的位图 (最低位为最近一次, 1 表示答对), 正确率 = bit_count / 次数
+    recent_correct_mask = Column(BigInteger, default=0, server_default=text("0"), nullable=False)
+    # 最近 64 次评分的环形缓冲区 (每字节一次), history_head 为下一次写入的位置
+    # 完整复习记录由触发器归档到 user_progress_history
+    history_ring = Column(
+        LargeBinary(HISTORY_RING_SIZE),
+        default=bytes(HISTORY_RING_SIZE),
+        server_default=text(f"decode(repeat('00', {HISTORY_RING_SIZE}), 'hex')"),
+        nullable=False
+    )
+    history_head = Column(SmallInteger, default=0, server_default=text("0"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
+    # 关联对象不做隐式懒加载, 需要时在查询中显式 join / selectinload
+    user = relationship("User", lazy="raise")
+    word = relationship("Word", lazy="raise")
+
     __table_args__ = (
-        Index('idx_user_next_review', 'user_id', 'next_review_at'),
-        Index('idx_user_status', 'user_id', 'status'),
+        # 待复习查询专用的部分索引: 只收录未掌握的单词, 条件须与查询中的 status < 3 一致才能被选用
+        Index('idx_user_due', 'user_id', 'next_review_at', postgresql_where=text('status < 3')),
+        # 覆盖索引: 按状态统计 / 看板查询可走 Index Only Scan, 无需回表
+        Index(
+            'idx_user_status_cov', 'user_id', 'status',
+            postgresql_include=['next_review_at', 'ease_factor', 'interval', 'correct_count', 'total_reviews']
+        ),
+        Index('idx_user_status_due', 'user_id', 'status', 'next_review_at'),
         Index('idx_user_word_unique', 'user_id', 'word_id', unique=True),
+        {'postgresql_partition_by': 'HASH (user_id)'},
     )
 
     def __repr__(self):
         return f"<UserProgress(id={self.id}, user_id={self.user_id}, word_id={self.word_id}, status={self.status})>"
+
+
+# 建表后创建各哈希分区 (索引由父表自动继承到每个分区)
+for _remainder in range(PARTITION_COUNT):
+    event.listen(
+        UserProgress.__table__,
+        "after_create",
+        DDL(
+            f"CREATE TABLE IF NOT EXISTS user_progress_p{_remainder} PARTITION OF user_progress "
+            f"FOR VALUES WITH (MODULUS {PARTITION_COUNT}, REMAINDER {_remainder})"
+        ).execute_if(dialect="postgresql")
+    )
@@ -0,0 +1,88 @@
+from sqlalchemy import Column, BigInteger, Integer, SmallInteger, Float, DateTime, ForeignKey, Index, DDL, event, table, column
+from app.core.database import Base
+
+
+class UserProgressHistory(Base):
+    """
+    复习记录归档, 每次复习一行, 由 user_progress 上的触发器写入
+
+    user_progress 行内只保留最近 64 次评分的环形缓冲区, 长期统计分析读取本表
+    """
+    __tablename__ = "user_progress_history"
+
+    id = Column(BigInteger, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    word_id = Column(Integer, ForeignKey("words.id", ondelete="CASCADE"), nullable=False)
+    quality = Column(SmallInteger, nullable=False)
+    time_spent = Column(Float, nullable=True)
+    interval = Column(Integer, nullable=False)
+    ease_factor = Column(Float, nullable=False)
+    reviewed_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index('idx_history_user_reviewed', 'user_id', 'reviewed_at'),
+    )
+
+    def __repr__(self):
+        return f"<UserProgressHistory(id={self.id}, user_id={self.user_id}, word_id={self.word_id}, quality={self.quality})>"
+
+
+# 触发器函数: 每次复习 (插入新进度行, 或 total_reviews 增加) 归档一条记录
+_HISTORY_FUNCTION = DDL("""
+CREATE OR REPLACE FUNCTION user_progress_history_archive() RETURNS trigger AS $$
+BEGIN
+    IF NEW.last_quality IS NOT NULL
+       AND (TG_OP = 'INSERT' OR NEW.total_reviews <> OLD.total_reviews) THEN
+        INSERT INTO user_progress_history
+            (user_id, word_id, quality, time_spent, interval, ease_factor, reviewed_at)
+        VALUES (
+            NEW.user_id, NEW.word_id, NEW.last_quality, NEW.last_time_spent,
+            NEW.interval, NEW.ease_factor, coalesce(NEW.last_review_at, now())
+        );
+    END IF;
+
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+""")
+
+_HISTORY_TRIGGER_DROP = DDL("DROP TRIGGER IF EXISTS trg_user_progress_history ON user_progress")
+
+_HISTORY_TRIGGER_CREATE = DDL("""
+CREATE TRIGGER trg_user_progress_history
+AFTER INSERT OR UPDATE OF total_reviews ON user_progress
+FOR EACH ROW EXECUTE FUNCTION user_progress_history_archive()
+""")
+
+# 按用户、按天预聚合的复习统计 (学习统计图表读取), 由定时任务并发刷新
+_STATS_MV_CREATE = DDL("""
+CREATE MATERIALIZED VIEW IF NOT EXISTS user_study_stats_mv AS
+SELECT
+    user_id,
+    (reviewed_at AT TIME ZONE 'UTC')::date AS review_date,
+    count(*) AS reviews,
+    count(*) FILTER (WHERE quality >= 3) AS correct,
+    coalesce(sum(time_spent), 0) AS time_spent
+FROM user_progress_history
+GROUP BY user_id, (reviewed_at AT TIME ZONE 'UTC')::date
+""")
+
+# REFRESH ... CONCURRENTLY 需要唯一索引
+_STATS_MV_INDEX = DDL(
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_study_stats_mv_user_date "
+    "ON user_study_stats_mv (user_id, review_date)"
+)
+
+# 供查询使用的轻量表结构 (物化视图不参与 create_all 建表)
+user_study_stats_mv = table(
+    "user_study_stats_mv",
+    column("user_id"),
+    column("review_date"),
+    column("reviews"),
+    column("correct"),
+    column("time_spent"),
+)
+
+# 在 create_all 完成后执行 (所有表均已存在), 每条语句均可重复执行
+for _ddl in (_HISTORY_FUNCTION, _HISTORY_TRIGGER_DROP, _HISTORY_TRIGGER_CREATE, _STATS_MV_CREATE, _STATS_MV_INDEX):
+    event.listen(Base.metadata, "after_create", _ddl.execute_if(dialect="postgresql"))
@@ -0,0 +1,95 @@
+from sqlalchemy import Column, Integer, BigInteger, ForeignKey, DDL, event
+from app.core.database import Base
+
+
+class UserProgressStats(Base):
+    """
+    每个用户一行的学习统计汇总, 由 user_progress 上的触发器维护
+
+    get_study_stats 直接读取这一行, 无需每次聚合 user_progress
+    """
+    __tablename__ = "user_progress_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    total_words = Column(Integer, default=0, nullable=False)
+    mastered = Column(Integer, default=0, nullable=False)
+    learning = Column(Integer, default=0, nullable=False)
+    new_words = Column(Integer, default=0, nullable=False)
+    correct_count = Column(BigInteger, default=0, nullable=False)
+    total_reviews = Column(BigInteger, default=0, nullable=False)
+
+    def __repr__(self):
+        return f"<UserProgressStats(user_id={self.user_id}, total_words={self.total_words})>"
+
+
+# 触发器函数: 先减去 OLD 行的贡献, 再加上 NEW 行的贡献 (状态变化即为 -1/+1)
+_STATS_FUNCTION = DDL("""
+CREATE OR REPLACE FUNCTION user_progress_stats_apply() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO user_progress_stats AS s
+            (user_id, total_words, mastered, learning, new_words, correct_count, total_reviews)
+        VALUES (
+            OLD.user_id, -1,
+            -((OLD.status = 3)::int), -((OLD.status IN (1, 2))::int), -((OLD.status = 0)::int),
+            -OLD.correct_count, -OLD.total_reviews
+        )
+        ON CONFLICT (user_id) DO UPDATE SET
+            total_words = s.total_words + EXCLUDED.total_words,
+            mastered = s.mastered + EXCLUDED.mastered,
+            learning = s.learning + EXCLUDED.learning,
+            new_words = s.new_words + EXCLUDED.new_words,
+            correct_count = s.correct_count + EXCLUDED.correct_count,
+            total_reviews = s.total_reviews + EXCLUDED.total_reviews;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO user_progress_stats AS s
+            (user_id, total_words, mastered, learning, new_words, correct_count, total_reviews)
+        VALUES (
+            NEW.user_id, 1,
+            (NEW.status = 3)::int, (NEW.status IN (1, 2))::int, (NEW.status = 0)::int,
+            NEW.correct_count, NEW.total_reviews
+        )
+        ON CONFLICT (user_id) DO UPDATE SET
+            total_words = s.total_words + EXCLUDED.total_words,
+            mastered = s.mastered + EXCLUDED.mastered,
+            learning = s.learning + EXCLUDED.learning,
+            new_words = s.new_words + EXCLUDED.new_words,
+            correct_count = s.correct_count + EXCLUDED.correct_count,
+            total_reviews = s.total_reviews + EXCLUDED.total_reviews;
+    END IF;
+
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+""")
+
+_STATS_TRIGGER_DROP = DDL("DROP TRIGGER IF EXISTS trg_user_progress_stats ON user_progress")
+
+_STATS_TRIGGER_CREATE = DDL("""
+CREATE TRIGGER trg_user_progress_stats
+AFTER INSERT OR UPDATE OR DELETE ON user_progress
+FOR EACH ROW EXECUTE FUNCTION user_progress_stats_apply()
+""")
+
+# 为尚无汇总行的用户回填 (与触发器在同一事务中执行, 因此不会遗漏并发写入)
+_STATS_BACKFILL = DDL("""
+INSERT INTO user_progress_stats
+    (user_id, total_words, mastered, learning, new_words, correct_count, total_reviews)
+SELECT
+    user_id,
+    count(*),
+    count(*) FILTER (WHERE status = 3),
+    count(*) FILTER (WHERE status IN (1, 2)),
+    count(*) FILTER (WHERE status = 0),
+    coalesce(sum(correct_count), 0),
+    coalesce(sum(total_reviews), 0)
+FROM user_progress
+GROUP BY user_id
+ON CONFLICT (user_id) DO NOTHING
+""")
+
+# 在 create_all 完成后执行 (所有表均已存在), 每条语句均可重复执行
+for _ddl in (_STATS_FUNCTION, _STATS_TRIGGER_DROP, _STATS_TRIGGER_CREATE, _STATS_BACKFILL):
+    event.listen(Base.metadata, "after_create", _ddl.execute_if(dialect="postgresql"))
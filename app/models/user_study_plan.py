@@ -19,5 +19,9 @@ class UserStudyPlan(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
+    # Related rows must be loaded explicitly (join / selectinload); lazy access raises
+    user = relationship("User", lazy="raise")
+    book = relationship("Book", lazy="raise")
+
     def __repr__(self):
         return f"<UserStudyPlan(id={self.id}, name='{self.name}', user_id={self.user_id})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Float, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Float, Boolean, DateTime, ForeignKey, Index, text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -9,7 +9,7 @@ class Word(Base):
     __tablename__ = "words"
 
     id = Column(Integer, primary_key=True, index=True)
-    book_id = Column(Integer, ForeignKey("books.id"), nullable=False)
+    book_id = Column(Integer, ForeignKey("books.id", ondelete="CASCADE"), nullable=False)
     spelling = Column(String(100), unique=True, index=True, nullable=False)
     phonetic = Column(String(100), nullable=True)
     definitions = Column(JSONB, nullable=False)
@@ -25,5 +25,16 @@ class Word(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
+    __table_args__ = (
+        Index('idx_words_book_spelling', 'book_id', 'spelling'),
+        # Trigram index so ILIKE '%term%' searches avoid a full scan (needs pg_trgm)
+        Index('idx_words_spelling_trgm', 'spelling', postgresql_using='gin', postgresql_ops={'spelling': 'gin_trgm_ops'}),
+        # GIN indexes for JSONB containment queries (tags @> '["cet4"]', definitions @> ...)
+        Index('idx_words_tags_gin', 'tags', postgresql_using='gin'),
+        Index('idx_words_defs_gin', 'definitions', postgresql_using='gin', postgresql_ops={'definitions': 'jsonb_path_ops'}),
+        # Ranked pagination within a book; unranked words are left out of the index
+        Index('idx_words_book_rank', 'book_id', 'frequency_rank', postgresql_where=text('frequency_rank IS NOT NULL')),
+    )
+
     def __repr__(self):
         return f"<Word(id={self.id}, spelling='{self.spelling}')>"
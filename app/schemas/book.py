@@ -1,7 +1,7 @@
 """
 Pydantic schemas for book management.
 """
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
@@ -40,8 +40,7 @@ class BookInfo(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class BookListResponse(BaseModel):
@@ -70,8 +69,7 @@ class TaskInfo(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class TaskStatusResponse(BaseModel):
@@ -97,8 +95,7 @@ class WordInfo(BaseModel):
     book_id: Optional[int]
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class WordListResponse(BaseModel):
@@ -107,6 +104,12 @@ class WordListResponse(BaseModel):
     words: List[WordInfo]
 
 
+# Module-level adapters build their validators/serializers once and handle a
+# whole page of ORM rows in a single call
+BOOK_LIST_ADAPTER = TypeAdapter(List[BookInfo])
+WORD_LIST_ADAPTER = TypeAdapter(List[WordInfo])
+
+
 class WordCreate(BaseModel):
     """Schema for creating a new word."""
     spelling: str = Field(..., min_length=1, max_length=100)
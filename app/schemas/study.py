@@ -48,6 +48,25 @@ class StudySubmitResponse(BaseModel):
     status: int
 
 
+class StudySubmitBatchItem(BaseModel):
+    word_id: int
+    quality: int = Field(..., ge=0, le=5)
+    time_spent: float = Field(..., ge=0)
+
+
+class StudySubmitBatchRequest(BaseModel):
+    session_id: str
+    results: List[StudySubmitBatchItem] = Field(..., min_length=1, max_length=200)
+
+
+class StudySubmitBatchResult(StudySubmitResponse):
+    word_id: int
+
+
+class StudySubmitBatchResponse(BaseModel):
+    results: List[StudySubmitBatchResult]
+
+
 class ChartData(BaseModel):
     dates: List[str]
     reviews: List[int]
@@ -1,15 +1,128 @@
 """
 AI Service for data cleaning and content enrichment using LLM APIs.
 """
+import asyncio
+import hashlib
 import logging
-import json
-from typing import List, Dict, Any, Optional
+import orjson
+from typing import List, Dict, Any, Optional, Tuple
+import httpx
+import redis
 from openai import AsyncOpenAI
 from anthropic import AsyncAnthropic
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Connection pool size for the provider HTTP client
+HTTP_MAX_CONNECTIONS = 100
+
+# OpenAI Batch API: every request line targets this endpoint, and a batch
+# finishes (at half the per-token price) within the completion window
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_COMPLETION_WINDOW = "24h"
+BATCH_FAILED_STATUSES = ("failed", "expired", "cancelled")
+
+# Static parts of the LLM prompts; only the per-call values are formatted in
+_CLEAN_PROMPT_HEAD = """Extract vocabulary words from the following OCR text and structure them as JSON.
+
+OCR Text:
+"""
+
+_CLEAN_INSTRUCTIONS = """
+
+Instructions:
+1. Identify all vocabulary words in the text
+2. Extract spelling, phonetic transcription, and definitions
+3. Group multiple definitions by part of speech (pos)
+4. Extract example sentences if available
+5. Infer appropriate tags (e.g., "cet4", "toefl", "business")
+"""
+
+_CLEAN_WORD_EXAMPLE = """{
+      "spelling": "decorate",
+      "phonetic": "/ˈdekəreɪt/",
+      "definitions": [
+        {"pos": "vt", "cn": "装饰; 点缀", "en": "make something look more attractive"},
+        {"pos": "n", "cn": "勋章", "en": "medal"}
+      ],
+      "sentences": [
+        {"en": "They decorated the room with flowers.", "cn": "他们用花装饰了房间。"}
+      ],
+      "tags": ["cet4", "common"]
+    }"""
+
+_CLEAN_RULES = """
+
+Important:
+- Only include words that are clearly vocabulary entries
+- Skip page numbers, headers, and irrelevant text
+- Ensure all JSON is valid and properly formatted
+- If phonetic is unclear, use empty string
+- If no example sentences, use empty array"""
+
+_CLEAN_PROMPT_TAIL = (
+    _CLEAN_INSTRUCTIONS
+    + '\nOutput format (JSON):\n{\n  "words": [\n    '
+    + _CLEAN_WORD_EXAMPLE
+    + "\n  ]\n}"
+    + _CLEAN_RULES
+)
+
+# Multi-page variant: pages are separated by ===PAGE n=== markers and words
+# come back grouped by page
+_CLEAN_PAGES_PROMPT_HEAD = """Extract vocabulary words from the following OCR text of several pages and structure them as JSON.
+Each page starts with a ===PAGE n=== marker line.
+
+OCR Text:"""
+
+_CLEAN_PAGES_PROMPT_TAIL = (
+    _CLEAN_INSTRUCTIONS
+    + "6. Keep each word under the page number it appears on\n"
+    + '\nOutput format (JSON):\n{\n  "pages": [\n    {\n      "page_number": 12,\n      "words": [\n    '
+    + _CLEAN_WORD_EXAMPLE
+    + "\n      ]\n    }\n  ]\n}"
+    + _CLEAN_RULES
+)
+
+_CLEAN_SYSTEM_PROMPT = "You are an expert at extracting and structuring vocabulary data from OCR text. Always respond with valid JSON."
+
+_ENRICH_SYSTEM_PROMPT = "You are an expert English teacher creating engaging learning materials. Always respond with valid JSON."
+
+_ENRICH_PROMPT_HEAD = 'Generate engaging learning materials for the English word "'
+
+_ENRICH_PROMPT_TAIL = """
+
+Please provide:
+
+1. **Example Sentences** (2-3 sentences):
+   - Use the word in realistic, college-level contexts
+   - Provide both English and Chinese translations
+   - Make them memorable and practical
+
+2. **Mnemonic** (memory technique):
+   - Use root/affix analysis if applicable
+   - Or create a vivid association/story
+   - Keep it concise and memorable
+   - Explain in Chinese for better understanding
+
+3. **Usage Notes** (optional):
+   - Common collocations
+   - Usage tips or common mistakes
+   - Register (formal/informal)
+
+Output format (JSON):
+{
+  "sentences": [
+    {"en": "The artist decorated the gallery with her paintings.", "cn": "艺术家用她的画作装饰了画廊。"},
+    {"en": "We need to decorate the house before the party.", "cn": "我们需要在派对前装饰房子。"}
+  ],
+  "mnemonic": "de(加强) + cor(心) + ate → 用心装饰。想象用心装饰一个房间,让它变得更美。",
+  "usage_notes": "常与 with 搭配使用,如 decorate with flowers。正式和非正式场合都可使用。"
+}
+
+Make the content engaging, accurate, and helpful for Chinese learners of English."""
+
 
 class AIService:
     """Service for AI-powered data cleaning and content enrichment."""
@@ -29,31 +142,85 @@ class AIService:
             api_key: API key (if None, uses from settings)
         """
         self.provider = provider.lower()
+        if self.provider not in ("openai", "anthropic"):
+            raise ValueError(f"Unsupported provider: {provider}")
+
+        # Shared HTTP/2 client: keep-alive connections are reused across calls
+        # and concurrent requests multiplex over them instead of queueing on
+        # the SDK's default connection limits
+        self.http_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_CONNECTIONS
+            )
+        )
 
         if self.provider == "openai":
             self.model = model or "gpt-4o-mini"
             api_key = api_key or settings.OPENAI_API_KEY
-            self.client = AsyncOpenAI(api_key=api_key)
-        elif self.provider == "anthropic":
+            self.client = AsyncOpenAI(api_key=api_key, http_client=self.http_client)
+        else:
             self.model = model or "claude-3-haiku-20240307"
             api_key = api_key or settings.ANTHROPIC_API_KEY
-            self.client = AsyncAnthropic(api_key=api_key)
-        else:
-            raise ValueError(f"Unsupported provider: {provider}")
+            self.client = AsyncAnthropic(api_key=api_key, http_client=self.http_client)
+
+        # Response cache. The client is sync (run in a thread), so it isn't
+        # bound to an event loop and can be created before any loop runs.
+        self.cache_ttl = settings.AI_CACHE_TTL_SECONDS
+        self.cache = None
+        if self.cache_ttl:
+            self.cache = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
 
         logger.info(f"AI Service initialized with provider={provider}, model={self.model}")
 
+    def _cache_key(self, temperature: float, prompt: str, model: Optional[str] = None) -> str:
+        """Build the response cache key for a prompt."""
+        digest = hashlib.blake2b(
+            f"{self.provider}:{model or self.model}:{temperature}:{prompt}".encode(),
+            digest_size=16
+        ).hexdigest()
+        return f"ai:response:{digest}"
+
+    async def close(self) -> None:
+        """Close the pooled HTTP connections."""
+        await self.http_client.aclose()
+
+    async def _cache_get(self, key: str) -> Optional[str]:
+        """Get a cached raw response, or None on a miss or cache error."""
+        if self.cache is None:
+            return None
+        try:
+            return await asyncio.to_thread(self.cache.get, key)
+        except Exception as e:
+            logger.warning(f"AI cache get failed: {str(e)}")
+            return None
+
+    async def _cache_set(self, key: str, content: str) -> None:
+        """Store a raw response that parsed as valid JSON."""
+        if self.cache is None:
+            return
+        try:
+            await asyncio.to_thread(self.cache.setex, key, self.cache_ttl, content)
+        except Exception as e:
+            logger.warning(f"AI cache set failed: {str(e)}")
+
     async def clean_ocr_data(
         self,
         ocr_text: str,
-        context: Optional[str] = None
+        context: Optional[str] = None,
+        max_concurrent: int = 5
     ) -> List[Dict[str, Any]]:
         """
         Clean and structure OCR text into vocabulary entries.
 
+        Long text is split into overlapping windows that are cleaned
+        concurrently; entries are then merged by spelling.
+
         Args:
             ocr_text: Raw OCR text output
             context: Additional context about the source (e.g., "CET-4 vocabulary book")
+            max_concurrent: Maximum number of concurrent API calls
 
         Returns:
             List of structured word entries with fields:
@@ -66,21 +233,140 @@ class AIService:
         Raises:
             Exception: If API call fails
         """
-        prompt = self._build_cleaning_prompt(ocr_text, context)
+        chunks = self._chunk_ocr(ocr_text)
+        if len(chunks) <= 1:
+            return await self._clean_chunk(ocr_text, context)
+
+        semaphore = asyncio.Semaphore(max_concurrent)
+
+        async def clean_single(chunk: str) -> List[Dict[str, Any]]:
+            async with semaphore:
+                return await self._clean_chunk(chunk, context)
+
+        chunk_results = await asyncio.gather(*[clean_single(c) for c in chunks])
+
+        # Overlapping windows extract boundary entries twice; the later window
+        # saw the entry from its start, so its copy wins
+        merged: Dict[str, Dict[str, Any]] = {}
+        for words in chunk_results:
+            for word in words:
+                merged[word.get("spelling", "")] = word
+
+        logger.info(f"Cleaned OCR data in {len(chunks)} chunks: extracted {len(merged)} words")
+        return list(merged.values())
+
+    @staticmethod
+    def _chunk_ocr(text: str, target_tokens: int = 1800, overlap: int = 200) -> List[str]:
+        """
+        Split OCR text into overlapping windows on line boundaries.
+
+        Tokens are estimated by whitespace splitting, so vocabulary lines are
+        never cut in half.
+
+        Args:
+            text: OCR text
+            target_tokens: Approximate tokens per window
+            overlap: Approximate tokens repeated from the end of the previous window
+
+        Returns:
+            List of text windows (a single item when the text is short)
+        """
+        lines = text.splitlines()
+        line_tokens = [len(line.split()) for line in lines]
+        if sum(line_tokens) <= target_tokens:
+            return [text]
+
+        chunks = []
+        start = 0
+        while start < len(lines):
+            end = start
+            size = 0
+            while end < len(lines) and (size == 0 or size + line_tokens[end] <= target_tokens):
+                size += line_tokens[end]
+                end += 1
+            chunks.append("\n".join(lines[start:end]))
+            if end >= len(lines):
+                break
+
+            # Step back far enough to repeat ~overlap tokens, but always advance
+            next_start = end
+            carried = 0
+            while next_start - 1 > start and carried + line_tokens[next_start - 1] <= overlap:
+                next_start -= 1
+                carried += line_tokens[next_start]
+            start = next_start
+
+        return chunks
+
+    async def clean_ocr_data_batch(
+        self,
+        pages: List[Tuple[int, str]],
+        context: Optional[str] = None
+    ) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Clean several short OCR pages with a single API call.
+
+        Pages are joined with ===PAGE n=== markers and the model returns the
+        words grouped by page, so the per-request overhead is paid once per
+        batch rather than once per page. Callers should keep the combined
+        text within one cleaning window (see _chunk_ocr).
 
+        Args:
+            pages: (page_number, ocr_text) pairs
+            context: Additional context about the source
+
+        Returns:
+            Dictionary mapping each page number to its word entries
+
+        Raises:
+            Exception: If API call fails
+        """
         try:
+            result = await self._run_cleaning_prompt(self._build_pages_prompt(pages, context))
+        except Exception as e:
+            logger.error(f"Error cleaning OCR pages: {str(e)}")
+            raise
+
+        words_by_page: Dict[int, List[Dict[str, Any]]] = {page_number: [] for page_number, _ in pages}
+        for page in result.get("pages", []):
+            page_number = page.get("page_number")
+            if page_number in words_by_page:
+                words_by_page[page_number].extend(page.get("words", []))
+
+        logger.info(
+            f"Cleaned {len(pages)} OCR pages in one call: "
+            f"extracted {sum(len(w) for w in words_by_page.values())} words"
+        )
+        return words_by_page
+
+    async def _clean_chunk(
+        self,
+        ocr_text: str,
+        context: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        """Clean a single window of OCR text with one API call."""
+        try:
+            result = await self._run_cleaning_prompt(self._build_cleaning_prompt(ocr_text, context))
+            words = result.get("words", [])
+
+            logger.info(f"Cleaned OCR data: extracted {len(words)} words")
+            return words
+
+        except Exception as e:
+            logger.error(f"Error cleaning OCR data: {str(e)}")
+            raise
+
+    async def _run_cleaning_prompt(self, prompt: str) -> Dict[str, Any]:
+        """Send a cleaning prompt (or serve it from the cache) and parse the JSON reply."""
+        cache_key = self._cache_key(0.1, prompt)
+
+        content = await self._cache_get(cache_key)
+        cached = content is not None
+
+        if not cached:
             if self.provider == "openai":
                 response = await self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": "You are an expert at extracting and structuring vocabulary data from OCR text. Always respond with valid JSON."
-                        },
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=0.1,
-                    response_format={"type": "json_object"}
+                    **self._openai_request(_CLEAN_SYSTEM_PROMPT, prompt, 0.1)
                 )
                 content = response.choices[0].message.content
 
@@ -95,16 +381,11 @@ class AIService:
                 )
                 content = response.content[0].text
 
-            # Parse JSON response
-            result = json.loads(content)
-            words = result.get("words", [])
-
-            logger.info(f"Cleaned OCR data: extracted {len(words)} words")
-            return words
-
-        except Exception as e:
-            logger.error(f"Error cleaning OCR data: {str(e)}")
-            raise
+        # Parse JSON response
+        result = orjson.loads(content)
+        if not cached:
+            await self._cache_set(cache_key, content)
+        return result
 
     async def enrich_word(
         self,
@@ -128,38 +409,41 @@ class AIService:
             Exception: If API call fails
         """
         prompt = self._build_enrichment_prompt(word, existing_data)
+        model = self.enrichment_model(word)
+        # Keyed by spelling rather than the full prompt, so the same word
+        # in another book (with its own definitions) is served from cache
+        cache_key = self._cache_key(
+            0.7, f"{_ENRICH_SYSTEM_PROMPT}\n{_ENRICH_PROMPT_TAIL}\n{word.strip().lower()}", model
+        )
 
         try:
-            if self.provider == "openai":
-                response = await self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": "You are an expert English teacher creating engaging learning materials. Always respond with valid JSON."
-                        },
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=0.7,
-                    response_format={"type": "json_object"}
-                )
-                content = response.choices[0].message.content
-
-            elif self.provider == "anthropic":
-                response = await self.client.messages.create(
-                    model=self.model,
-                    max_tokens=2048,
-                    temperature=0.7,
-                    messages=[
-                        {"role": "user", "content": prompt}
-                    ]
-                )
-                content = response.content[0].text
+            content = await self._cache_get(cache_key)
+            cached = content is not None
+
+            if not cached:
+                if self.provider == "openai":
+                    response = await self.client.chat.completions.create(
+                        **self._openai_request(_ENRICH_SYSTEM_PROMPT, prompt, 0.7, model)
+                    )
+                    content = response.choices[0].message.content
+
+                elif self.provider == "anthropic":
+                    response = await self.client.messages.create(
+                        model=model,
+                        max_tokens=2048,
+                        temperature=0.7,
+                        messages=[
+                            {"role": "user", "content": prompt}
+                        ]
+                    )
+                    content = response.content[0].text
 
             # Parse JSON response
-            enriched_data = json.loads(content)
+            enriched_data = orjson.loads(content)
+            if not cached:
+                await self._cache_set(cache_key, content)
 
-            logger.info(f"Enriched word: {word}")
+            logger.info("Enriched word: %s", word)
             return enriched_data
 
         except Exception as e:
@@ -181,67 +465,242 @@ class AIService:
         Returns:
             List of enriched word dictionaries
         """
-        import asyncio
+        # Cap in-flight calls to respect rate limits; a slot frees up as soon
+        # as any call returns instead of waiting on the slowest in a batch
+        semaphore = asyncio.Semaphore(max_concurrent)
 
         async def enrich_single(word_data: Dict[str, Any]) -> Dict[str, Any]:
             try:
                 spelling = word_data.get("spelling", "")
-                enriched = await self.enrich_word(spelling, word_data)
+                async with semaphore:
+                    enriched = await self.enrich_word(spelling, word_data)
                 return {**word_data, **enriched}
             except Exception as e:
                 logger.error(f"Failed to enrich {word_data.get('spelling')}: {str(e)}")
                 return word_data
 
-        # Process in batches to respect rate limits
-        results = []
-        for i in range(0, len(words), max_concurrent):
-            batch = words[i:i + max_concurrent]
-            batch_results = await asyncio.gather(*[enrich_single(w) for w in batch])
-            results.extend(batch_results)
+        results = await asyncio.gather(*[enrich_single(w) for w in words])
 
         logger.info(f"Batch enriched {len(results)} words")
         return results
 
+    def cleaning_batch_requests(
+        self,
+        groups: List[List[Tuple[int, str]]],
+        context: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Build Batch API request lines for cleaning groups of OCR pages.
+
+        A single-page group is chunked like clean_ocr_data, one request per
+        window (custom_id "page-<n>-<chunk>"); a multi-page group becomes one
+        multi-page prompt (custom_id "pages-<n>-<n>...").
+
+        Args:
+            groups: Page groups of (page_number, ocr_text) pairs
+            context: Additional context about the source
+
+        Returns:
+            Request lines for submit_batch
+        """
+        requests = []
+        for group in groups:
+            if len(group) == 1:
+                page_number, ocr_text = group[0]
+                page_context = f"{context} page {page_number}" if context else None
+                for index, chunk in enumerate(self._chunk_ocr(ocr_text)):
+                    requests.append(self._batch_request(
+                        f"page-{page_number}-{index}",
+                        self._openai_request(
+                            _CLEAN_SYSTEM_PROMPT, self._build_cleaning_prompt(chunk, page_context), 0.1
+                        )
+                    ))
+            else:
+                requests.append(self._batch_request(
+                    "pages-" + "-".join(str(page_number) for page_number, _ in group),
+                    self._openai_request(_CLEAN_SYSTEM_PROMPT, self._build_pages_prompt(group, context), 0.1)
+                ))
+        return requests
+
+    @staticmethod
+    def parse_cleaning_batch_results(results: Dict[str, Dict[str, Any]]) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Group cleaning batch results by page.
+
+        Args:
+            results: Parsed replies by custom_id, from get_batch_results
+
+        Returns:
+            Dictionary mapping each page number to its word entries
+        """
+        words_by_page: Dict[int, List[Dict[str, Any]]] = {}
+        page_chunks: Dict[int, List[Tuple[int, List[Dict[str, Any]]]]] = {}
+        for custom_id, result in results.items():
+            kind, *numbers = custom_id.split("-")
+            if kind == "page":
+                page_chunks.setdefault(int(numbers[0]), []).append((int(numbers[1]), result.get("words", [])))
+                continue
+
+            group_pages = {int(n) for n in numbers}
+            for page in result.get("pages", []):
+                page_number = page.get("page_number")
+                if page_number in group_pages:
+                    words_by_page.setdefault(page_number, []).extend(page.get("words", []))
+
+        # Same merge as clean_ocr_data: the later window's copy of an entry wins
+        for page_number, chunks in page_chunks.items():
+            merged: Dict[str, Dict[str, Any]] = {}
+            for _, words in sorted(chunks, key=lambda chunk: chunk[0]):
+                for word in words:
+                    merged[word.get("spelling", "")] = word
+            words_by_page[page_number] = list(merged.values())
+
+        return words_by_page
+
+    def enrichment_batch_requests(self, words: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Build Batch API request lines for enriching words (custom_id "word-<id>").
+
+        Args:
+            words: Word dictionaries with an "id"
+
+        Returns:
+            Request lines for submit_batch
+        """
+        return [
+            self._batch_request(
+                f"word-{word_data['id']}",
+                self._openai_request(
+                    _ENRICH_SYSTEM_PROMPT,
+                    self._build_enrichment_prompt(word_data.get("spelling", ""), word_data),
+                    0.7,
+                    self.enrichment_model(word_data.get("spelling", ""))
+                )
+            )
+            for word_data in words
+        ]
+
+    async def submit_batch(self, jsonl_requests: List[Dict[str, Any]]) -> str:
+        """
+        Submit request lines as one OpenAI Batch API job.
+
+        Args:
+            jsonl_requests: Request lines (see cleaning_batch_requests)
+
+        Returns:
+            Batch ID to pass to get_batch_results
+
+        Raises:
+            ValueError: If the provider has no batch support here
+        """
+        if self.provider != "openai":
+            raise ValueError(f"Batch API is not supported for provider: {self.provider}")
+
+        content = b"".join(orjson.dumps(line) + b"\n" for line in jsonl_requests)
+        input_file = await self.client.files.create(file=("batch.jsonl", content), purpose="batch")
+        batch = await self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=BATCH_COMPLETION_WINDOW
+        )
+
+        logger.info(f"Submitted batch {batch.id} with {len(jsonl_requests)} requests")
+        return batch.id
+
+    async def get_batch_results(self, batch_id: str) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Fetch the parsed replies of a finished batch.
+
+        Args:
+            batch_id: ID returned by submit_batch
+
+        Returns:
+            Parsed JSON reply by custom_id (failed requests are left out),
+            or None while the batch is still running
+
+        Raises:
+            RuntimeError: If the batch failed, expired or was cancelled
+        """
+        batch = await self.client.batches.retrieve(batch_id)
+        if batch.status in BATCH_FAILED_STATUSES:
+            raise RuntimeError(f"Batch {batch_id} {batch.status}")
+        if batch.status != "completed":
+            return None
+
+        results: Dict[str, Dict[str, Any]] = {}
+        if batch.output_file_id:
+            output = await self.client.files.content(batch.output_file_id)
+            for line in output.content.splitlines():
+                if not line.strip():
+                    continue
+                item = orjson.loads(line)
+                response = item.get("response") or {}
+                if item.get("error") or response.get("status_code") != 200:
+                    logger.warning(f"Batch {batch_id} request {item.get('custom_id')} failed: {item.get('error')}")
+                    continue
+                try:
+                    results[item["custom_id"]] = orjson.loads(
+                        response["body"]["choices"][0]["message"]["content"]
+                    )
+                except Exception as e:
+                    logger.warning(f"Batch {batch_id} request {item.get('custom_id')} unparsable: {str(e)}")
+
+        logger.info(f"Fetched batch {batch_id}: {len(results)} replies")
+        return results
+
+    def enrichment_model(self, word: str) -> str:
+        """
+        Pick the model tier for enriching a word.
+
+        Short words are common and simple, so they stay on the service's
+        (small) model; longer, rarer words go to AI_ENRICH_STRONG_MODEL
+        when one is configured.
+
+        Args:
+            word: The word to enrich
+
+        Returns:
+            Model name
+        """
+        if settings.AI_ENRICH_STRONG_MODEL and len(word.strip()) > settings.AI_ENRICH_SIMPLE_MAX_LEN:
+            return settings.AI_ENRICH_STRONG_MODEL
+        return self.model
+
+    def _openai_request(
+        self,
+        system_prompt: str,
+        prompt: str,
+        temperature: float,
+        model: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Build chat completion parameters, shared by real-time and batch calls."""
+        return {
+            "model": model or self.model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": temperature,
+            "response_format": {"type": "json_object"}
+        }
+
+    @staticmethod
+    def _batch_request(custom_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Wrap chat completion parameters as one Batch API request line."""
+        return {"custom_id": custom_id, "method": "POST", "url": BATCH_ENDPOINT, "body": body}
+
     def _build_cleaning_prompt(self, ocr_text: str, context: Optional[str]) -> str:
         """Build prompt for OCR data cleaning."""
         context_str = f"\n\nContext: {context}" if context else ""
 
-        return f"""Extract vocabulary words from the following OCR text and structure them as JSON.
-
-OCR Text:
-{ocr_text}{context_str}
-
-Instructions:
-1. Identify all vocabulary words in the text
-2. Extract spelling, phonetic transcription, and definitions
-3. Group multiple definitions by part of speech (pos)
-4. Extract example sentences if available
-5. Infer appropriate tags (e.g., "cet4", "toefl", "business")
+        return f"{_CLEAN_PROMPT_HEAD}{ocr_text}{context_str}{_CLEAN_PROMPT_TAIL}"
 
-Output format (JSON):
-{{
-  "words": [
-    {{
-      "spelling": "decorate",
-      "phonetic": "/ˈdekəreɪt/",
-      "definitions": [
-        {{"pos": "vt", "cn": "装饰; 点缀", "en": "make something look more attractive"}},
-        {{"pos": "n", "cn": "勋章", "en": "medal"}}
-      ],
-      "sentences": [
-        {{"en": "They decorated the room with flowers.", "cn": "他们用花装饰了房间。"}}
-      ],
-      "tags": ["cet4", "common"]
-    }}
-  ]
-}}
+    def _build_pages_prompt(self, pages: List[Tuple[int, str]], context: Optional[str]) -> str:
+        """Build prompt for cleaning several OCR pages at once."""
+        context_str = f"\n\nContext: {context}" if context else ""
+        pages_text = "".join(f"\n\n===PAGE {page_number}===\n\n{text}" for page_number, text in pages)
 
-Important:
-- Only include words that are clearly vocabulary entries
-- Skip page numbers, headers, and irrelevant text
-- Ensure all JSON is valid and properly formatted
-- If phonetic is unclear, use empty string
-- If no example sentences, use empty array"""
+        return f"{_CLEAN_PAGES_PROMPT_HEAD}{pages_text}{context_str}{_CLEAN_PAGES_PROMPT_TAIL}"
 
     def _build_enrichment_prompt(
         self,
@@ -249,47 +708,15 @@ Important:
         existing_data: Optional[Dict[str, Any]]
     ) -> str:
         """Build prompt for word enrichment."""
-        definitions_str = ""
-        if existing_data and "definitions" in existing_data:
-            defs = existing_data["definitions"]
+        definitions_block = ""
+        if existing_data and existing_data.get("definitions"):
             definitions_str = "\n".join([
                 f"- {d.get('pos', '')}: {d.get('cn', '')} ({d.get('en', '')})"
-                for d in defs
+                for d in existing_data["definitions"]
             ])
+            definitions_block = f"Existing definitions:\n{definitions_str}\n"
 
-        return f"""Generate engaging learning materials for the English word "{word}".
-
-{f"Existing definitions:\n{definitions_str}\n" if definitions_str else ""}
-
-Please provide:
-
-1. **Example Sentences** (2-3 sentences):
-   - Use the word in realistic, college-level contexts
-   - Provide both English and Chinese translations
-   - Make them memorable and practical
-
-2. **Mnemonic** (memory technique):
-   - Use root/affix analysis if applicable
-   - Or create a vivid association/story
-   - Keep it concise and memorable
-   - Explain in Chinese for better understanding
-
-3. **Usage Notes** (optional):
-   - Common collocations
-   - Usage tips or common mistakes
-   - Register (formal/informal)
-
-Output format (JSON):
-{{
-  "sentences": [
-    {{"en": "The artist decorated the gallery with her paintings.", "cn": "艺术家用她的画作装饰了画廊。"}},
-    {{"en": "We need to decorate the house before the party.", "cn": "我们需要在派对前装饰房子。"}}
-  ],
-  "mnemonic": "de(加强) + cor(心) + ate → 用心装饰。想象用心装饰一个房间,让它变得更美。",
-  "usage_notes": "常与 with 搭配使用,如 decorate with flowers。正式和非正式场合都可使用。"
-}}
-
-Make the content engaging, accurate, and helpful for Chinese learners of English."""
+        return f'{_ENRICH_PROMPT_HEAD}{word}".\n\n{definitions_block}{_ENRICH_PROMPT_TAIL}'
 
     async def validate_word_data(
         self,
@@ -306,7 +733,7 @@ Make the content engaging, accurate, and helpful for Chinese learners of English
         """
         prompt = f"""Review and correct the following vocabulary entry if needed:
 
-{json.dumps(word_data, ensure_ascii=False, indent=2)}
+{orjson.dumps(word_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()}
 
 Check for:
 1. Spelling accuracy
@@ -316,36 +743,43 @@ Check for:
 5. Appropriate tags
 
 Return the corrected version in the same JSON format. If everything is correct, return the original data."""
+        cache_key = self._cache_key(0.1, prompt)
 
         try:
-            if self.provider == "openai":
-                response = await self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": "You are an expert English teacher validating vocabulary data. Always respond with valid JSON."
-                        },
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=0.1,
-                    response_format={"type": "json_object"}
-                )
-                content = response.choices[0].message.content
-
-            elif self.provider == "anthropic":
-                response = await self.client.messages.create(
-                    model=self.model,
-                    max_tokens=2048,
-                    temperature=0.1,
-                    messages=[
-                        {"role": "user", "content": prompt}
-                    ]
-                )
-                content = response.content[0].text
-
-            validated_data = json.loads(content)
-            logger.info(f"Validated word: {word_data.get('spelling')}")
+            content = await self._cache_get(cache_key)
+            cached = content is not None
+
+            if not cached:
+                if self.provider == "openai":
+                    response = await self.client.chat.completions.create(
+                        model=self.model,
+                        messages=[
+                            {
+                                "role": "system",
+                                "content": "You are an expert English teacher validating vocabulary data. Always respond with valid JSON."
+                            },
+                            {"role": "user", "content": prompt}
+                        ],
+                        temperature=0.1,
+                        response_format={"type": "json_object"}
+                    )
+                    content = response.choices[0].message.content
+
+                elif self.provider == "anthropic":
+                    response = await self.client.messages.create(
+                        model=self.model,
+                        max_tokens=2048,
+                        temperature=0.1,
+                        messages=[
+                            {"role": "user", "content": prompt}
+                        ]
+                    )
+                    content = response.content[0].text
+
+            validated_data = orjson.loads(content)
+            if not cached:
+                await self._cache_set(cache_key, content)
+            logger.info("Validated word: %s", word_data.get("spelling"))
             return validated_data
 
         except Exception as e:
@@ -375,3 +809,11 @@ def get_ai_service(
     if _ai_service is None:
         _ai_service = AIService(provider=provider, model=model)
     return _ai_service
+
+
+async def close_ai_service() -> None:
+    """Close the AI service singleton's HTTP client, if one was created."""
+    global _ai_service
+    if _ai_service is not None:
+        await _ai_service.close()
+        _ai_service = None
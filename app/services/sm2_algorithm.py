@@ -1,5 +1,6 @@
-from datetime import datetime, timedelta
-from typing import Tuple
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+import numpy as np
 
 
 class SM2Algorithm:
@@ -18,7 +19,8 @@ class SM2Algorithm:
         quality: int,
         prev_interval: int,
         prev_ease_factor: float,
-        prev_repetitions: int
+        prev_repetitions: int,
+        now: Optional[datetime] = None
     ) -> Tuple[int, float, int, datetime]:
         """
         计算下次复习时间和相关参数
@@ -28,6 +30,7 @@ class SM2Algorithm:
             prev_interval: 上次复习间隔 (天)
             prev_ease_factor: 上次难度因子
             prev_repetitions: 连续正确次数
+            now: 本次复习时间 (批量计算时由调用方传入, 默认取当前 UTC 时间)
 
         Returns:
             (new_interval, new_ease_factor, new_repetitions, next_review_at)
@@ -53,10 +56,63 @@ class SM2Algorithm:
             new_repetitions = prev_repetitions + 1
 
         # 计算下次复习时间
-        next_review_at = datetime.utcnow() + timedelta(days=new_interval)
+        next_review_at = (now or datetime.utcnow()) + timedelta(days=new_interval)
 
         return new_interval, new_ease_factor, new_repetitions, next_review_at
 
+    @staticmethod
+    def calculate_next_review_batch(
+        qualities: np.ndarray,
+        prev_intervals: np.ndarray,
+        prev_ease_factors: np.ndarray,
+        prev_repetitions: np.ndarray,
+        now: Optional[datetime] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        批量版 calculate_next_review, 逐元素结果与单条计算一致
+
+        Args:
+            qualities: 用户反馈质量数组 (0-5)
+            prev_intervals: 上次复习间隔数组 (天)
+            prev_ease_factors: 上次难度因子数组
+            prev_repetitions: 连续正确次数数组
+            now: 本次复习时间 (默认取当前 UTC 时间, 整批共用一次);
+                datetime64 不带时区, 带时区的时间先换算为 UTC 再去掉时区
+
+        Returns:
+            (new_intervals, new_ease_factors, new_repetitions, next_review_ats),
+            next_review_ats 为 datetime64[s] 数组 (naive UTC, 与 calculate_next_review 默认值一致)
+        """
+        qualities = np.asarray(qualities, dtype=np.int64)
+        prev_intervals = np.asarray(prev_intervals, dtype=np.int64)
+        prev_ease_factors = np.asarray(prev_ease_factors, dtype=np.float64)
+        prev_repetitions = np.asarray(prev_repetitions, dtype=np.int64)
+
+        # 评分低于3的重置进度
+        below = qualities < 3
+        penalty = 5 - qualities
+        new_ease_factors = np.where(
+            below,
+            prev_ease_factors,
+            np.maximum(1.3, prev_ease_factors + (0.1 - penalty * (0.08 + penalty * 0.02)))
+        )
+        new_repetitions = np.where(below, 0, prev_repetitions + 1)
+        new_intervals = np.where(
+            below | (prev_repetitions == 0),
+            1,
+            np.where(prev_repetitions == 1, 6, (prev_intervals * new_ease_factors).astype(np.int64))
+        )
+
+        # 计算下次复习时间
+        if now is None:
+            now = datetime.utcnow()
+        elif now.tzinfo is not None:
+            now = now.astimezone(timezone.utc).replace(tzinfo=None)
+        base = np.datetime64(now, "s")
+        next_review_ats = base + (new_intervals * 86400).astype("timedelta64[s]")
+
+        return new_intervals, new_ease_factors, new_repetitions, next_review_ats
+
     @staticmethod
     def get_status_from_quality(quality: int, prev_status: int) -> int:
         """
@@ -1,29 +1,301 @@
 """
 Celery tasks initialization.
 """
+import asyncio
+import gzip
+import inspect
+import sys
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Coroutine, Dict, List, Optional, TypeVar
+import orjson
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown
+from kombu import Producer
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.models.book import Book
+from app.models.celery_task import CeleryTask, TaskStatus, TaskType
+from app.services.ai_service import close_ai_service
+
+try:
+    import uvloop
+except ImportError:  # uvloop doesn't support Windows
+    uvloop = None
+
+T = TypeVar("T")
 
 # Create Celery app
 celery_app = Celery(
     "smart_vocab",
     broker=settings.CELERY_BROKER_URL,
     backend=settings.CELERY_RESULT_BACKEND,
-    include=["app.tasks.pdf_tasks", "app.tasks.ai_tasks"]
+    include=["app.tasks.pdf_tasks", "app.tasks.ai_tasks", "app.tasks.stats_tasks"]
 )
 
 # Configure Celery
 celery_app.conf.update(
-    task_serializer="json",
-    accept_content=["json"],
-    result_serializer="json",
+    # msgpack is faster and smaller than JSON for float-heavy OCR payloads;
+    # JSON stays accepted so messages queued before the switch still run
+    task_serializer="msgpack",
+    accept_content=["msgpack", "json"],
+    result_serializer="msgpack",
+    result_accept_content=["msgpack", "json"],
+    # OCR results (text + bboxes per block, per page) compress well; results
+    # expire because the API only polls them while a task is fresh
+    task_compression="gzip",
+    result_compression="gzip",
+    result_expires=settings.CELERY_RESULT_EXPIRES_SECONDS,
+    result_backend_always_retry=True,
+    result_backend_transport_options=settings.CELERY_RESULT_BACKEND_TRANSPORT_OPTIONS,
     timezone="UTC",
     enable_utc=True,
     task_track_started=True,
     task_time_limit=3600,  # 1 hour
     task_soft_time_limit=3300,  # 55 minutes
+    # Heavy OCR runs on its own queue so it never blocks AI tasks; run
+    # OCR workers with -Q pdf --concurrency=1 (one OCR job per GPU) and the
+    # rest with -Q ai,celery
+    task_routes={
+        "process_pdf_book": {"queue": "pdf"},
+        "process_page_range": {"queue": "pdf"},
+        "process_single_page": {"queue": "pdf"},
+        "clean_ocr_data": {"queue": "ai"},
+        "enrich_word": {"queue": "ai"},
+        "batch_enrich_words": {"queue": "ai"},
+        "poll_batch": {"queue": "ai"},
+    },
+    # Ack after the task finishes, so a crashed worker's long OCR job is
+    # redelivered instead of lost
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    # Redis redelivers unacked messages after the visibility timeout; with
+    # late acks it must outlast task_time_limit, or a long job runs twice
+    broker_transport_options={"visibility_timeout": 2 * 3600},
     worker_prefetch_multiplier=1,
+    worker_concurrency=settings.CELERY_WORKER_CONCURRENCY,
     worker_max_tasks_per_child=1000,
+    beat_schedule={
+        "refresh-study-stats": {
+            "task": "refresh_study_stats",
+            "schedule": settings.STUDY_STATS_REFRESH_SECONDS,
+        },
+    },
 )
 
-__all__ = ["celery_app"]
+# Event loop reused by every task in a worker process
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def run_async(coro: Coroutine[Any, Any, T]) -> T:
+    """
+    Run a coroutine to completion on the worker process's event loop.
+
+    Tasks share app.core.database's engine, and pooled asyncpg connections
+    (like the AI service's HTTP connections) are bound to the loop that
+    opened them, so every call must run on the same loop; a fresh loop per
+    asyncio.run would strand them.
+
+    Args:
+        coro: Coroutine to run
+
+    Returns:
+        The coroutine's result
+    """
+    global _loop
+    if _loop is None or _loop.is_closed():
+        # libuv-based loop: much lower per-task scheduling overhead
+        _loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
+        if sys.version_info >= (3, 12):
+            # Tasks that finish without suspending (cache hits, short DB
+            # round trips under gather) skip a trip through the scheduler
+            _loop.set_task_factory(asyncio.eager_task_factory)
+        asyncio.set_event_loop(_loop)
+    return _loop.run_until_complete(coro)
+
+
+def async_task(fn: Callable[..., Coroutine[Any, Any, T]]) -> Callable[..., T]:
+    """
+    Run a coroutine function as a Celery task body.
+
+    Stack it under @celery_app.task, so the whole task is one coroutine on
+    the worker's event loop (see run_async) and its helpers are plain awaits.
+
+    Args:
+        fn: Coroutine function implementing the task
+
+    Returns:
+        Synchronous function calling fn through run_async
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        return run_async(fn(*args, **kwargs))
+
+    # Celery checks call arguments against the plain signature, which
+    # doesn't follow __wrapped__
+    wrapper.__signature__ = inspect.signature(fn)
+    return wrapper
+
+
+def consumes_queue(queue: str) -> bool:
+    """
+    Whether this worker consumes a queue (selected with -Q).
+
+    Task modules use it from worker_process_init to preload only the
+    services their queue needs.
+    """
+    return queue in celery_app.amqp.queues.consume_from
+
+
+@worker_process_init.connect
+def _init_worker_process(**kwargs) -> None:
+    """Drop pooled connections inherited from the parent across the prefork."""
+    engine.sync_engine.dispose(close=False)
+
+
+@worker_process_shutdown.connect
+def _shutdown_worker_process(**kwargs) -> None:
+    """Close pooled DB and HTTP connections, then the worker's event loop."""
+    if _loop is not None and not _loop.is_closed():
+        run_async(close_ai_service())
+        run_async(engine.dispose())
+        _loop.close()
+
+
+async def update_task_status(
+    task_id: str,
+    status: TaskStatus,
+    book_id: int,
+    task_type: TaskType,
+    result: Optional[Dict[str, Any]] = None,
+    error_message: Optional[str] = None
+) -> None:
+    """
+    Upsert a task's CeleryTask row with a single statement.
+
+    The first status change creates the row, owned by the book's uploader
+    (task_type only applies then); later ones update status, outcome and
+    timing. started_at is kept from the first call and completed_at is
+    set on COMPLETED/FAILED.
+
+    Args:
+        task_id: Celery task ID
+        status: New status
+        book_id: ID of the book the task works on
+        task_type: Task type recorded when the row is created
+        result: Result to store (None keeps the stored one)
+        error_message: Error to store (None keeps the stored one)
+    """
+    finished = status in (TaskStatus.COMPLETED, TaskStatus.FAILED)
+    values = {
+        "task_id": task_id,
+        "task_type": task_type,
+        "status": status,
+        "progress": 100 if status == TaskStatus.COMPLETED else 0,
+        "created_by": select(Book.created_by).where(Book.id == book_id).scalar_subquery(),
+        "started_at": func.now(),
+        "completed_at": func.now() if finished else None,
+    }
+    # Only pass what is being set: omitted columns insert as SQL NULL, which
+    # the COALESCEs below turn into "keep the current value" (an explicit
+    # None would be stored in the JSONB column as JSON null)
+    if result:
+        values["result"] = result
+    if error_message:
+        values["error_message"] = error_message
+
+    stmt = pg_insert(CeleryTask).values(**values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CeleryTask.task_id],
+        set_={
+            "status": stmt.excluded.status,
+            "progress": stmt.excluded.progress,
+            "completed_at": stmt.excluded.completed_at,
+            "result": func.coalesce(stmt.excluded.result, CeleryTask.result),
+            "error_message": func.coalesce(stmt.excluded.error_message, CeleryTask.error_message),
+        }
+    )
+
+    async with AsyncSessionLocal() as session:
+        await session.execute(stmt)
+        await session.commit()
+
+
+# Large task outputs (per-page OCR results) are written here, next to the
+# uploaded books, and handed between tasks by path instead of through the
+# result backend
+TASK_ARTIFACT_DIR = Path("uploads") / "tasks"
+
+
+def save_task_artifact(task_id: str, data: Any) -> Dict[str, Any]:
+    """
+    Write a task output to a gzip-compressed JSON file.
+
+    Args:
+        task_id: ID of the producing task (names the file)
+        data: JSON-serializable output
+
+    Returns:
+        Reference for load_task_artifact: {"path": ..., "size": compressed bytes}
+    """
+    TASK_ARTIFACT_DIR.mkdir(parents=True, exist_ok=True)
+    path = TASK_ARTIFACT_DIR / f"{task_id}.json.gz"
+    with gzip.open(path, "wb", compresslevel=1) as f:
+        f.write(orjson.dumps(data))
+    return {"path": str(path), "size": path.stat().st_size}
+
+
+def load_task_artifact(ref: Dict[str, Any]) -> Any:
+    """Read a task output written by save_task_artifact."""
+    with gzip.open(ref["path"], "rb") as f:
+        return orjson.loads(f.read())
+
+
+def remove_task_artifacts(refs: List[Dict[str, Any]]) -> None:
+    """Delete task outputs once their consumer is done with them."""
+    for ref in refs:
+        Path(ref["path"]).unlink(missing_ok=True)
+
+
+# Producer shared by the API process for publishing tasks
+_producer: Optional[Producer] = None
+
+
+def get_task_producer() -> Producer:
+    """
+    Get or acquire the shared task producer.
+
+    Passing it as ``apply_async(producer=...)`` reuses one broker connection
+    instead of acquiring a producer from the pool for every publish.
+
+    Returns:
+        Kombu Producer instance
+    """
+    global _producer
+    if _producer is None:
+        _producer = celery_app.producer_pool.acquire(block=True)
+    return _producer
+
+
+def release_task_producer() -> None:
+    """Return the shared producer to the pool (call on shutdown)."""
+    global _producer
+    if _producer is not None:
+        _producer.release()
+        _producer = None
+
+
+__all__ = [
+    "celery_app",
+    "run_async",
+    "async_task",
+    "consumes_queue",
+    "update_task_status",
+    "save_task_artifact",
+    "load_task_artifact",
+    "remove_task_artifacts",
+    "get_task_producer",
+    "release_task_producer",
+]
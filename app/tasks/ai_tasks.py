@@ -1,125 +1,200 @@
 """
 Celery tasks for AI-powered data cleaning and enrichment.
 """
+import asyncio
 import logging
-from typing import List, Dict, Any
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
-
-from app.tasks import celery_app
+from typing import List, Dict, Any, AsyncIterator, Optional, Tuple
+import orjson
+from celery.exceptions import Ignore
+from celery.signals import worker_process_init
+from sqlalchemy import select, update, func, text, table, column
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.tasks import (
+    async_task,
+    celery_app,
+    consumes_queue,
+    load_task_artifact,
+    remove_task_artifacts,
+    update_task_status,
+)
 from app.services.ai_service import get_ai_service
 from app.models.word import Word
 from app.models.book import Book
-from app.models.celery_task import CeleryTask, TaskStatus
+from app.models.celery_task import TaskStatus, TaskType
 from app.core.config import settings
+from app.core.database import AsyncSessionLocal
 
 logger = logging.getLogger(__name__)
 
+# CeleryTask type of the task that submitted a batch, by poll_batch kind
+BATCH_TASK_TYPES = {"clean": TaskType.PDF_PARSE, "enrich": TaskType.AI_ENRICH}
+
+# LLM used by every AI task
+AI_PROVIDER = "openai"
+AI_MODEL = "gpt-4o-mini"
+
+# Word batches at least this large are loaded with COPY instead of a multi-row INSERT
+WORD_COPY_THRESHOLD = 100
+WORD_COPY_COLUMNS = ["book_id", "spelling", "phonetic", "definitions", "sentences", "tags"]
+
+# LLM cleaning calls in flight at the same time
+PAGE_CLEAN_CONCURRENCY = 8
+
+# Word enrichment calls kept in flight, and how many finished words are
+# written per bulk UPDATE
+WORD_ENRICH_CONCURRENCY = 16
+WORD_UPDATE_BATCH_SIZE = 32
+
+# Words read per query while streaming a book's words
+WORD_FETCH_BATCH_SIZE = 64
+
+# Columns read for enrichment; rows come back as plain mappings, without
+# building ORM objects
+WORD_DATA_COLUMNS = (Word.id, Word.spelling, Word.phonetic, Word.definitions, Word.sentences, Word.tags)
+
+# Short pages are packed into one multi-page prompt, up to this many pages and
+# this many (whitespace) tokens, the same window clean_ocr_data chunks by
+PAGES_PER_PROMPT = 5
+PAGE_BATCH_TOKEN_BUDGET = 1800
+
+# Pages sharing a prompt are of similar length: the longest is at most this
+# many times the shortest (pages under the floor count as the floor)
+PAGE_BUCKET_MAX_RATIO = 1.3
+PAGE_BUCKET_MIN_TOKENS = 50
+
+
+@worker_process_init.connect
+def _preload_services(**kwargs) -> None:
+    """Create the AI service (and its HTTP client) when an ai worker process starts."""
+    if consumes_queue("ai"):
+        get_ai_service(provider=AI_PROVIDER, model=AI_MODEL)
+
 
 @celery_app.task(bind=True, name="clean_ocr_data")
-def clean_ocr_data(
+@async_task
+async def clean_ocr_data(
     self,
-    book_id: int,
-    ocr_results: List[Dict[str, Any]]
+    ocr_result_files: List[Dict[str, Any]],
+    book_id: int
 ) -> Dict[str, Any]:
     """
     Clean OCR data and extract structured vocabulary entries.
 
+    Runs as the body of process_pdf_book's chord. The OCR result files are
+    deleted once cleaning has finished or failed.
+
     Args:
+        ocr_result_files: Saved OCR results per page, one file per process_page_range task
         book_id: ID of the book
-        ocr_results: List of OCR results from PDF processing
 
     Returns:
         Dictionary with cleaned word entries
     """
-    import asyncio
-
     task_id = self.request.id
     logger.info(f"Starting data cleaning task {task_id} for book {book_id}")
 
     try:
         # Update task status
-        asyncio.run(_update_task_status(task_id, TaskStatus.PROCESSING, book_id))
+        await update_task_status(task_id, TaskStatus.RUNNING, book_id, TaskType.PDF_PARSE)
 
         # Initialize AI service
-        ai_service = get_ai_service(provider="openai", model="gpt-4o-mini")
+        ai_service = get_ai_service(provider=AI_PROVIDER, model=AI_MODEL)
 
-        # Process each page's OCR results
-        all_words = []
+        # Clean pages with AI: short pages are packed into multi-page
+        # prompts, and several prompts are in flight at once
+        ocr_results = [page_result for ref in ocr_result_files for page_result in load_task_artifact(ref)]
         total_pages = len(ocr_results)
+        pages = [
+            (page_result["page_number"], page_result["formatted_text"])
+            for page_result in ocr_results
+            if page_result.get("formatted_text")
+        ]
+        groups = _group_pages(pages)
 
-        for i, page_result in enumerate(ocr_results, 1):
-            self.update_state(
-                state="PROGRESS",
-                meta={
-                    "current": i,
-                    "total": total_pages,
-                    "status": f"Cleaning page {i}/{total_pages}"
-                }
+        if settings.AI_USE_BATCH_API:
+            # Hand all prompts to the Batch API; poll_batch saves the words
+            # and stores this task's result
+            batch_id = await ai_service.submit_batch(
+                ai_service.cleaning_batch_requests(groups, context="Vocabulary book")
+            )
+            await _schedule_batch_poll(
+                task_id,
+                batch_id,
+                "clean",
+                book_id,
+                page_numbers=[page_number for page_number, _ in pages],
+                total=total_pages
             )
+            raise Ignore()
 
-            formatted_text = page_result.get("formatted_text", "")
-            if not formatted_text:
-                continue
+        semaphore = asyncio.Semaphore(PAGE_CLEAN_CONCURRENCY)
+        words_by_page: Dict[int, List[Dict[str, Any]]] = {}
+        pages_done = total_pages - len(pages)
 
-            # Clean OCR data with AI
+        async def clean_group(group: List[Tuple[int, str]]) -> None:
+            nonlocal pages_done
             try:
-                words = asyncio.run(ai_service.clean_ocr_data(
-                    formatted_text,
-                    context=f"Vocabulary book page {page_result['page_number']}"
-                ))
-
-                # Add page number to each word
-                for word in words:
-                    word["source_page"] = page_result["page_number"]
-
-                all_words.extend(words)
-                logger.info(f"Cleaned page {i}: extracted {len(words)} words")
+                async with semaphore:
+                    if len(group) == 1:
+                        page_number, formatted_text = group[0]
+                        group_words = {page_number: await ai_service.clean_ocr_data(
+                            formatted_text,
+                            context=f"Vocabulary book page {page_number}"
+                        )}
+                    else:
+                        group_words = await ai_service.clean_ocr_data_batch(group, context="Vocabulary book")
+
+                for page_number, words in group_words.items():
+                    words_by_page[page_number] = words
+                    logger.info("Cleaned page %d: extracted %d words", page_number, len(words))
 
             except Exception as e:
-                logger.error(f"Error cleaning page {i}: {str(e)}")
-                continue
+                logger.error(f"Error cleaning pages {[n for n, _ in group]}: {str(e)}")
 
-        # Save words to database
-        saved_count = asyncio.run(_save_words_to_db(book_id, all_words))
-
-        # Update book status
-        asyncio.run(_update_book_status(book_id, "ready", len(all_words)))
+            pages_done += len(group)
+            self.update_state(
+                state="PROGRESS",
+                meta={
+                    "current": pages_done,
+                    "total": total_pages,
+                    "status": f"Cleaned page {pages_done}/{total_pages}"
+                }
+            )
 
-        result = {
-            "book_id": book_id,
-            "total_pages_processed": total_pages,
-            "total_words_extracted": len(all_words),
-            "total_words_saved": saved_count
-        }
+        await asyncio.gather(*[clean_group(group) for group in groups])
 
-        # Update task status
-        asyncio.run(_update_task_status(
+        return await _finish_cleaning(
             task_id,
-            TaskStatus.COMPLETED,
             book_id,
-            result=result
-        ))
+            [page_number for page_number, _ in pages],
+            words_by_page,
+            total_pages
+        )
 
-        logger.info(f"Completed data cleaning for book {book_id}: {saved_count} words saved")
-        return result
+    except Ignore:
+        raise
 
     except Exception as e:
         logger.error(f"Error cleaning data for book {book_id}: {str(e)}")
 
-        asyncio.run(_update_task_status(
+        await update_task_status(
             task_id,
             TaskStatus.FAILED,
             book_id,
+            TaskType.PDF_PARSE,
             error_message=str(e)
-        ))
+        )
 
         raise
 
+    finally:
+        remove_task_artifacts(ocr_result_files)
+
 
 @celery_app.task(bind=True, name="enrich_word")
-def enrich_word(self, word_id: int) -> Dict[str, Any]:
+@async_task
+async def enrich_word(self, word_id: int) -> Dict[str, Any]:
     """
     Enrich a single word with AI-generated content.
 
@@ -129,28 +204,26 @@ def enrich_word(self, word_id: int) -> Dict[str, Any]:
     Returns:
         Dictionary with enrichment results
     """
-    import asyncio
-
     task_id = self.request.id
     logger.info(f"Starting word enrichment task {task_id} for word {word_id}")
 
     try:
         # Get word from database
-        word_data = asyncio.run(_get_word_from_db(word_id))
+        word_data = await _get_word_from_db(word_id)
         if not word_data:
             raise ValueError(f"Word {word_id} not found")
 
         # Initialize AI service
-        ai_service = get_ai_service(provider="openai", model="gpt-4o-mini")
+        ai_service = get_ai_service(provider=AI_PROVIDER, model=AI_MODEL)
 
         # Enrich word
-        enriched_data = asyncio.run(ai_service.enrich_word(
+        enriched_data = await ai_service.enrich_word(
             word_data["spelling"],
             existing_data=word_data
-        ))
+        )
 
         # Update word in database
-        asyncio.run(_update_word_in_db(word_id, enriched_data))
+        await _update_word_in_db(word_id, enriched_data)
 
         result = {
             "word_id": word_id,
@@ -167,7 +240,8 @@ def enrich_word(self, word_id: int) -> Dict[str, Any]:
 
 
 @celery_app.task(bind=True, name="batch_enrich_words")
-def batch_enrich_words(
+@async_task
+async def batch_enrich_words(
     self,
     book_id: int,
     word_ids: List[int] = None
@@ -182,54 +256,80 @@ def batch_enrich_words(
     Returns:
         Dictionary with batch enrichment results
     """
-    import asyncio
-
     task_id = self.request.id
     logger.info(f"Starting batch enrichment task {task_id} for book {book_id}")
 
     try:
         # Update task status
-        asyncio.run(_update_task_status(task_id, TaskStatus.PROCESSING, book_id))
+        await update_task_status(task_id, TaskStatus.RUNNING, book_id, TaskType.AI_ENRICH)
 
-        # Get words to enrich
-        if word_ids is None:
-            words = asyncio.run(_get_words_by_book(book_id))
-        else:
-            words = asyncio.run(_get_words_by_ids(word_ids))
-
-        total_words = len(words)
+        # Words to enrich are streamed in WORD_FETCH_BATCH_SIZE chunks
+        condition = Word.book_id == book_id if word_ids is None else Word.id.in_(word_ids)
+        total_words = await _count_words(condition)
         logger.info(f"Enriching {total_words} words")
 
         # Initialize AI service
-        ai_service = get_ai_service(provider="openai", model="gpt-4o-mini")
+        ai_service = get_ai_service(provider=AI_PROVIDER, model=AI_MODEL)
+
+        if settings.AI_USE_BATCH_API:
+            # Hand all prompts to the Batch API; poll_batch writes the
+            # results and stores this task's result
+            requests = []
+            async for words in _iter_words(condition):
+                requests.extend(ai_service.enrichment_batch_requests(words))
+            batch_id = await ai_service.submit_batch(requests)
+            await _schedule_batch_poll(task_id, batch_id, "enrich", book_id, total=total_words)
+            raise Ignore()
+
+        # Keep a sliding window of enrichments in flight and write results
+        # as they arrive, so the API stays busy during the DB writes; the
+        # next chunk of words is only read once the window has room
+        async def enrich_one(word_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            try:
+                enriched = await ai_service.enrich_word(word_data["spelling"], existing_data=word_data)
+                return {**word_data, **enriched}
+            except Exception as e:
+                logger.error(f"Failed to enrich {word_data.get('spelling')}: {str(e)}")
+                return None
 
-        # Enrich words in batches
         enriched_count = 0
-        batch_size = 5
-
-        for i in range(0, total_words, batch_size):
-            batch = words[i:i + batch_size]
-
-            self.update_state(
-                state="PROGRESS",
-                meta={
-                    "current": i + len(batch),
-                    "total": total_words,
-                    "status": f"Enriching words {i + 1}-{i + len(batch)}/{total_words}"
-                }
-            )
-
-            # Enrich batch
-            enriched_batch = asyncio.run(ai_service.batch_enrich_words(batch, max_concurrent=5))
-
-            # Update words in database
-            for enriched_word in enriched_batch:
-                word_id = enriched_word.get("id")
-                if word_id:
-                    asyncio.run(_update_word_in_db(word_id, enriched_word))
-                    enriched_count += 1
-
-            logger.info(f"Enriched batch {i // batch_size + 1}: {len(enriched_batch)} words")
+        done_count = 0
+        pending: List[Dict[str, Any]] = []
+        in_flight = set()
+
+        async def collect(flush_all: bool = False) -> None:
+            nonlocal enriched_count, done_count, pending
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                in_flight.discard(future)
+                done_count += 1
+                enriched = future.result()
+                if enriched is not None:
+                    pending.append(enriched)
+
+            if len(pending) >= WORD_UPDATE_BATCH_SIZE or (flush_all and not in_flight):
+                # Update words in database
+                enriched_count += await _bulk_update_words(pending)
+                pending = []
+
+                self.update_state(
+                    state="PROGRESS",
+                    meta={
+                        "current": done_count,
+                        "total": total_words,
+                        "status": f"Enriched words {done_count}/{total_words}"
+                    }
+                )
+                logger.info("Enriched %d/%d words", done_count, total_words)
+
+        async for words in _iter_words(condition):
+            for word_data in words:
+                if len(in_flight) >= WORD_ENRICH_CONCURRENCY:
+                    await collect()
+                in_flight.add(asyncio.ensure_future(enrich_one(word_data)))
+
+        while in_flight:
+            await collect(flush_all=True)
 
         result = {
             "book_id": book_id,
@@ -238,121 +338,282 @@ def batch_enrich_words(
         }
 
         # Update task status
-        asyncio.run(_update_task_status(
+        await update_task_status(
             task_id,
             TaskStatus.COMPLETED,
             book_id,
+            TaskType.AI_ENRICH,
             result=result
-        ))
+        )
 
         logger.info(f"Completed batch enrichment for book {book_id}: {enriched_count} words enriched")
         return result
 
+    except Ignore:
+        raise
+
     except Exception as e:
         logger.error(f"Error in batch enrichment for book {book_id}: {str(e)}")
 
-        asyncio.run(_update_task_status(
+        await update_task_status(
             task_id,
             TaskStatus.FAILED,
             book_id,
+            TaskType.AI_ENRICH,
             error_message=str(e)
-        ))
+        )
+
+        raise
+
+
+# Nothing reads poll results (progress lives on the parent task's row), so
+# the backend isn't written on every poll
+@celery_app.task(bind=True, name="poll_batch", ignore_result=True)
+@async_task
+async def poll_batch(
+    self,
+    parent_task_id: str,
+    batch_id: str,
+    kind: str,
+    book_id: int,
+    page_numbers: List[int] = None,
+    total: int = 0
+) -> Dict[str, Any]:
+    """
+    Check an OpenAI Batch API job and store its results once it completes.
+
+    Reschedules itself every AI_BATCH_POLL_SECONDS while the batch runs.
+    The parent task ended without a result, so its Celery state (PROGRESS
+    while the batch runs, then SUCCESS or FAILURE) is stored from here.
+
+    Args:
+        parent_task_id: ID of the clean_ocr_data/batch_enrich_words task that submitted the batch
+        batch_id: Batch ID from submit_batch
+        kind: "clean" or "enrich"
+        book_id: ID of the book
+        page_numbers: Cleaned page numbers in book order ("clean" only)
+        total: Total pages ("clean") or words ("enrich")
+
+    Returns:
+        Dictionary with the batch status, or the parent task's results
+    """
+    try:
+        ai_service = get_ai_service(provider=AI_PROVIDER, model=AI_MODEL)
+        results = await ai_service.get_batch_results(batch_id)
+
+        if results is None:
+            self.update_state(
+                task_id=parent_task_id,
+                state="PROGRESS",
+                meta={"current": 0, "total": total, "status": f"Waiting for batch {batch_id}"}
+            )
+            return await _schedule_batch_poll(parent_task_id, batch_id, kind, book_id, page_numbers, total)
+
+        if kind == "clean":
+            words_by_page = ai_service.parse_cleaning_batch_results(results)
+            result = await _finish_cleaning(parent_task_id, book_id, page_numbers or [], words_by_page, total)
+            self.backend.mark_as_done(parent_task_id, result)
+            return result
+
+        enriched_count = await _bulk_update_words([
+            {**enriched, "id": int(custom_id.split("-", 1)[1])}
+            for custom_id, enriched in results.items()
+        ])
+        result = {
+            "book_id": book_id,
+            "total_words": total,
+            "enriched_count": enriched_count
+        }
+        await update_task_status(parent_task_id, TaskStatus.COMPLETED, book_id, TaskType.AI_ENRICH, result=result)
+        self.backend.mark_as_done(parent_task_id, result)
+
+        logger.info(f"Completed batch enrichment for book {book_id}: {enriched_count} words enriched")
+        return result
+
+    except Exception as e:
+        logger.error(f"Error polling batch {batch_id} for book {book_id}: {str(e)}")
+
+        await update_task_status(
+            parent_task_id,
+            TaskStatus.FAILED,
+            book_id,
+            BATCH_TASK_TYPES[kind],
+            error_message=str(e)
+        )
+        self.backend.mark_as_failure(parent_task_id, e)
 
         raise
 
 
 # Helper functions
 
-async def _update_task_status(
+async def _schedule_batch_poll(
     task_id: str,
-    status: TaskStatus,
+    batch_id: str,
+    kind: str,
     book_id: int,
-    result: Dict[str, Any] = None,
-    error_message: str = None
-):
-    """Update Celery task status in database."""
-    engine = create_async_engine(settings.DATABASE_URL)
-    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-
-    async with async_session() as session:
-        stmt = select(CeleryTask).where(CeleryTask.task_id == task_id)
-        result_obj = await session.execute(stmt)
-        task = result_obj.scalar_one_or_none()
-
-        if task:
-            task.status = status
-            if result:
-                task.result = result
-            if error_message:
-                task.error_message = error_message
-        else:
-            task = CeleryTask(
-                task_id=task_id,
-                task_name="clean_ocr_data",
-                status=status,
-                book_id=book_id,
-                result=result,
-                error_message=error_message
-            )
-            session.add(task)
+    page_numbers: Optional[List[int]] = None,
+    total: int = 0
+) -> Dict[str, Any]:
+    """Record a submitted batch on the task row and check it again after AI_BATCH_POLL_SECONDS."""
+    result = {"book_id": book_id, "batch_id": batch_id, "batch_status": "submitted"}
+    await update_task_status(task_id, TaskStatus.RUNNING, book_id, BATCH_TASK_TYPES[kind], result=result)
 
-        await session.commit()
+    poll_batch.apply_async(
+        args=[task_id, batch_id, kind, book_id, page_numbers, total],
+        countdown=settings.AI_BATCH_POLL_SECONDS
+    )
+    return result
 
-    await engine.dispose()
+
+async def _finish_cleaning(
+    task_id: str,
+    book_id: int,
+    page_numbers: List[int],
+    words_by_page: Dict[int, List[Dict[str, Any]]],
+    total_pages: int
+) -> Dict[str, Any]:
+    """Save cleaned words in page order and mark the book and task done."""
+    # Reassemble in page order, so later pages still win on duplicate spellings
+    all_words = []
+    for page_number in page_numbers:
+        for word in words_by_page.get(page_number, []):
+            # Add page number to each word
+            word["source_page"] = page_number
+            all_words.append(word)
+
+    # Save words to database
+    saved_count = await _save_words_to_db(book_id, all_words)
+
+    result = {
+        "book_id": book_id,
+        "total_pages_processed": total_pages,
+        "total_words_extracted": len(all_words),
+        "total_words_saved": saved_count
+    }
+
+    # Update book and task status; independent rows, so each commits on its
+    # own pooled connection at the same time
+    await asyncio.gather(
+        _update_book_status(book_id, "ready", len(all_words)),
+        update_task_status(
+            task_id,
+            TaskStatus.COMPLETED,
+            book_id,
+            TaskType.PDF_PARSE,
+            result=result
+        )
+    )
+
+    logger.info(f"Completed data cleaning for book {book_id}: {saved_count} words saved")
+    return result
+
+
+def _group_pages(pages: List[Tuple[int, str]]) -> List[List[Tuple[int, str]]]:
+    """
+    Bucket pages of similar length into groups for multi-page cleaning prompts.
+
+    Pages are sorted by token count, so a prompt isn't dominated by one long
+    page. A group holds up to PAGES_PER_PROMPT pages within
+    PAGE_BATCH_TOKEN_BUDGET tokens and PAGE_BUCKET_MAX_RATIO of its shortest
+    page; a page over the budget gets a group of its own (and is chunked by
+    clean_ocr_data). Callers restore book order by page number.
+    """
+    groups: List[List[Tuple[int, str]]] = []
+    group_tokens = 0
+    group_floor = 0
+    for tokens, page in sorted(((len(page[1].split()), page) for page in pages), key=lambda item: item[0]):
+        if (
+            not groups
+            or len(groups[-1]) >= PAGES_PER_PROMPT
+            or group_tokens + tokens > PAGE_BATCH_TOKEN_BUDGET
+            or tokens > group_floor * PAGE_BUCKET_MAX_RATIO
+        ):
+            groups.append([])
+            group_tokens = 0
+            group_floor = max(tokens, PAGE_BUCKET_MIN_TOKENS)
+        groups[-1].append(page)
+        group_tokens += tokens
+    return groups
 
 
 async def _save_words_to_db(book_id: int, words: List[Dict[str, Any]]) -> int:
-    """Save words to database."""
-    engine = create_async_engine(settings.DATABASE_URL)
-    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    """Upsert cleaned words by spelling; large batches are loaded with COPY."""
+    # One row per spelling: ON CONFLICT DO UPDATE can't touch the same row twice
+    rows = {}
+    for word_data in words:
+        spelling = (word_data.get("spelling") or "").lower()
+        if not spelling:
+            continue
+        rows[spelling] = {
+            "book_id": book_id,
+            "spelling": spelling,
+            "phonetic": word_data.get("phonetic") or "",
+            "definitions": word_data.get("definitions") or [],
+            "sentences": word_data.get("sentences") or [],
+            "tags": word_data.get("tags") or [],
+        }
 
-    saved_count = 0
+    if not rows:
+        return 0
 
-    async with async_session() as session:
-        for word_data in words:
-            try:
-                # Check if word already exists
-                spelling = word_data.get("spelling", "").lower()
-                stmt = select(Word).where(Word.spelling == spelling)
-                result = await session.execute(stmt)
-                existing_word = result.scalar_one_or_none()
-
-                if existing_word:
-                    # Update existing word
-                    existing_word.phonetic = word_data.get("phonetic") or existing_word.phonetic
-                    existing_word.definitions = word_data.get("definitions", [])
-                    existing_word.sentences = word_data.get("sentences", [])
-                    existing_word.tags = word_data.get("tags", [])
-                else:
-                    # Create new word
-                    new_word = Word(
-                        spelling=spelling,
-                        phonetic=word_data.get("phonetic", ""),
-                        definitions=word_data.get("definitions", []),
-                        sentences=word_data.get("sentences", []),
-                        tags=word_data.get("tags", []),
-                        book_id=book_id
+    async with AsyncSessionLocal() as session:
+        if len(rows) < WORD_COPY_THRESHOLD:
+            await session.execute(_upsert_words(pg_insert(Word).values(list(rows.values()))))
+        else:
+            # COPY the batch into a transaction-scoped staging table, then
+            # upsert from it in a single INSERT ... SELECT
+            await session.execute(text(
+                "CREATE TEMP TABLE words_staging ("
+                "book_id integer, spelling varchar(100), phonetic varchar(100), "
+                "definitions jsonb, sentences jsonb, tags jsonb"
+                ") ON COMMIT DROP"
+            ))
+            connection = await session.connection()
+            raw_connection = await connection.get_raw_connection()
+            await raw_connection.driver_connection.copy_records_to_table(
+                "words_staging",
+                records=[
+                    (
+                        row["book_id"],
+                        row["spelling"],
+                        row["phonetic"],
+                        orjson.dumps(row["definitions"]).decode(),
+                        orjson.dumps(row["sentences"]).decode(),
+                        orjson.dumps(row["tags"]).decode(),
                     )
-                    session.add(new_word)
-
-                saved_count += 1
+                    for row in rows.values()
+                ],
+                columns=WORD_COPY_COLUMNS
+            )
 
-            except Exception as e:
-                logger.error(f"Error saving word {word_data.get('spelling')}: {str(e)}")
-                continue
+            staging = table("words_staging", *[column(name) for name in WORD_COPY_COLUMNS])
+            await session.execute(_upsert_words(
+                pg_insert(Word).from_select(WORD_COPY_COLUMNS, select(*staging.c))
+            ))
 
         await session.commit()
-
-    await engine.dispose()
-    return saved_count
+    return len(rows)
+
+
+def _upsert_words(insert_stmt):
+    """Attach the on-conflict update used when a cleaned word already exists."""
+    return insert_stmt.on_conflict_do_update(
+        index_elements=["spelling"],
+        set_={
+            # Keep the stored phonetic when the new one is empty
+            "phonetic": func.coalesce(func.nullif(insert_stmt.excluded.phonetic, ""), Word.phonetic),
+            "definitions": insert_stmt.excluded.definitions,
+            "sentences": insert_stmt.excluded.sentences,
+            "tags": insert_stmt.excluded.tags,
+            "updated_at": func.now(),
+        }
+    )
 
 
 async def _update_book_status(book_id: int, status: str, total_words: int):
     """Update book status in database."""
-    engine = create_async_engine(settings.DATABASE_URL)
-    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-
-    async with async_session() as session:
+    async with AsyncSessionLocal() as session:
         stmt = select(Book).where(Book.id == book_id)
         result = await session.execute(stmt)
         book = result.scalar_one_or_none()
@@ -363,40 +624,20 @@ async def _update_book_status(book_id: int, status: str, total_words: int):
                 book.total_words = total_words
             await session.commit()
 
-    await engine.dispose()
-
 
 async def _get_word_from_db(word_id: int) -> Dict[str, Any]:
     """Get word data from database."""
-    engine = create_async_engine(settings.DATABASE_URL)
-    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-
-    async with async_session() as session:
-        stmt = select(Word).where(Word.id == word_id)
+    async with AsyncSessionLocal() as session:
+        stmt = select(*WORD_DATA_COLUMNS).where(Word.id == word_id)
         result = await session.execute(stmt)
-        word = result.scalar_one_or_none()
+        word = result.mappings().one_or_none()
 
-        if not word:
-            return None
-
-        return {
-            "id": word.id,
-            "spelling": word.spelling,
-            "phonetic": word.phonetic,
-            "definitions": word.definitions,
-            "sentences": word.sentences,
-            "tags": word.tags
-        }
-
-    await engine.dispose()
+        return dict(word) if word else None
 
 
 async def _update_word_in_db(word_id: int, enriched_data: Dict[str, Any]):
     """Update word with enriched data."""
-    engine = create_async_engine(settings.DATABASE_URL)
-    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-
-    async with async_session() as session:
+    async with AsyncSessionLocal() as session:
         stmt = select(Word).where(Word.id == word_id)
         result = await session.execute(stmt)
         word = result.scalar_one_or_none()
@@ -411,54 +652,57 @@ async def _update_word_in_db(word_id: int, enriched_data: Dict[str, Any]):
 
             await session.commit()
 
-    await engine.dispose()
 
+async def _bulk_update_words(enriched_words: List[Dict[str, Any]]) -> int:
+    """Write enriched fields for a batch of words in one bulk UPDATE by primary key."""
+    rows = []
+    for enriched_data in enriched_words:
+        if not enriched_data.get("id"):
+            continue
+        row = {"id": enriched_data["id"]}
+        for field in ("sentences", "mnemonic"):
+            if field in enriched_data:
+                row[field] = enriched_data[field]
+        if len(row) > 1:
+            rows.append(row)
+
+    if not rows:
+        return 0
+
+    async with AsyncSessionLocal() as session:
+        await session.execute(update(Word), rows)
+        await session.commit()
 
-async def _get_words_by_book(book_id: int) -> List[Dict[str, Any]]:
-    """Get all words for a book."""
-    engine = create_async_engine(settings.DATABASE_URL)
-    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    return len(rows)
 
-    async with async_session() as session:
-        stmt = select(Word).where(Word.book_id == book_id)
-        result = await session.execute(stmt)
-        words = result.scalars().all()
-
-        return [
-            {
-                "id": w.id,
-                "spelling": w.spelling,
-                "phonetic": w.phonetic,
-                "definitions": w.definitions,
-                "sentences": w.sentences,
-                "tags": w.tags
-            }
-            for w in words
-        ]
 
-    await engine.dispose()
+async def _count_words(condition) -> int:
+    """Count the words matching a filter."""
+    async with AsyncSessionLocal() as session:
+        return await session.scalar(select(func.count()).select_from(Word).where(condition))
 
 
-async def _get_words_by_ids(word_ids: List[int]) -> List[Dict[str, Any]]:
-    """Get words by IDs."""
-    engine = create_async_engine(settings.DATABASE_URL)
-    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+async def _iter_words(condition) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Stream the words matching a filter in chunks of WORD_FETCH_BATCH_SIZE.
 
-    async with async_session() as session:
-        stmt = select(Word).where(Word.id.in_(word_ids))
-        result = await session.execute(stmt)
-        words = result.scalars().all()
-
-        return [
-            {
-                "id": w.id,
-                "spelling": w.spelling,
-                "phonetic": w.phonetic,
-                "definitions": w.definitions,
-                "sentences": w.sentences,
-                "tags": w.tags
-            }
-            for w in words
-        ]
+    Each chunk is a keyset query (id > last id) in its own short session,
+    so only one chunk is in memory and no transaction or cursor stays open
+    while the caller spends minutes on API calls between chunks.
+    """
+    last_id = 0
+    while True:
+        async with AsyncSessionLocal() as session:
+            stmt = (
+                select(*WORD_DATA_COLUMNS)
+                .where(condition, Word.id > last_id)
+                .order_by(Word.id)
+                .limit(WORD_FETCH_BATCH_SIZE)
+            )
+            result = await session.execute(stmt)
+            chunk = [dict(row) for row in result.mappings()]
 
-    await engine.dispose()
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1]["id"]
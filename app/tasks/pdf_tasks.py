@@ -2,140 +2,203 @@
 Celery tasks for PDF processing and OCR.
 """
 import logging
-from typing import List, Dict, Any
-from pathlib import Path
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import List, Dict, Any, Iterator, Optional, TypeVar
+from celery import chord
+from celery.signals import worker_process_init
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
 
-from app.tasks import celery_app
+from app.tasks import celery_app, consumes_queue, run_async, save_task_artifact, update_task_status
 from app.services.pdf_service import get_pdf_service
 from app.services.ocr_service import get_ocr_service
+from app.tasks.ai_tasks import clean_ocr_data
 from app.models.book import Book
-from app.models.celery_task import CeleryTask, TaskStatus
-from app.core.config import settings
-from app.core.database import get_db
+from app.models.celery_task import TaskStatus, TaskType
+from app.core.database import AsyncSessionLocal, get_db
 
 logger = logging.getLogger(__name__)
 
+# Pages per OCR batch; the text lines of a batch are recognized together
+OCR_BATCH_SIZE = 8
+
+# Pages OCR'd by one process_page_range task; the ranges of a book run in
+# parallel across the pdf workers
+PAGES_PER_TASK = 64
+
+T = TypeVar("T")
+
+
+@worker_process_init.connect
+def _preload_services(**kwargs) -> None:
+    """Load the OCR models when a pdf worker process starts, not in its first task."""
+    if consumes_queue("pdf"):
+        get_pdf_service()
+        get_ocr_service(lang="ch")
+
 
 @celery_app.task(bind=True, name="process_pdf_book")
 def process_pdf_book(self, book_id: int, pdf_path: str) -> Dict[str, Any]:
     """
-    Process a PDF book: convert to images and extract text with OCR.
+    Process a PDF book: fan its pages out to OCR tasks, then clean the results.
+
+    Page ranges are OCR'd by process_page_range tasks in parallel, and a
+    chord hands their results straight to clean_ocr_data. The PDF stays on
+    disk and only its path is sent to the OCR tasks.
+
+    The task replaces itself with the chord, so clean_ocr_data runs under
+    this task's ID: pollers of this ID see OCR and cleaning progress, and
+    the final result is clean_ocr_data's. The CeleryTask row stays RUNNING
+    until cleaning finishes.
 
     Args:
         book_id: ID of the book in database
         pdf_path: Path to the PDF file
 
     Returns:
-        Dictionary with processing results:
-            - book_id: Book ID
-            - total_pages: Number of pages processed
-            - total_words_extracted: Number of words extracted
-            - ocr_results: List of OCR results per page
+        Nothing itself; the ID ends with clean_ocr_data's result
     """
-    import asyncio
-
     task_id = self.request.id
     logger.info(f"Starting PDF processing task {task_id} for book {book_id}")
 
     try:
-        # Update task status to PROCESSING
-        asyncio.run(_update_task_status(task_id, TaskStatus.PROCESSING, book_id))
-
-        # Initialize services
-        pdf_service = get_pdf_service(dpi=300)
-        ocr_service = get_ocr_service(lang="ch", use_gpu=False)
+        # Update task status to RUNNING
+        run_async(update_task_status(task_id, TaskStatus.RUNNING, book_id, TaskType.PDF_PARSE))
 
         # Get PDF info
-        pdf_info = pdf_service.get_pdf_info(pdf_path)
+        pdf_info = get_pdf_service().get_pdf_info(pdf_path)
         total_pages = pdf_info["total_pages"]
+        if total_pages == 0:
+            raise ValueError("PDF has no pages")
 
         logger.info(f"Processing PDF with {total_pages} pages")
 
-        # Update progress
-        self.update_state(
-            state="PROGRESS",
-            meta={"current": 0, "total": total_pages, "status": "Converting PDF to images"}
-        )
+        run_async(_update_book_status(book_id, "processing", total_pages))
 
-        # Convert PDF to images
-        output_dir = Path("uploads") / "temp" / f"book_{book_id}"
-        output_dir.mkdir(parents=True, exist_ok=True)
+        page_tasks = [
+            process_page_range.s(
+                book_id,
+                pdf_path,
+                first_page,
+                min(first_page + PAGES_PER_TASK - 1, total_pages),
+                total_pages,
+                task_id
+            )
+            for first_page in range(1, total_pages + 1, PAGES_PER_TASK)
+        ]
 
-        image_paths = pdf_service.convert_pdf_to_images(
-            pdf_path,
-            output_dir=str(output_dir)
-        )
+    except Exception as e:
+        logger.error(f"Error processing PDF for book {book_id}: {str(e)}")
 
-        logger.info(f"Converted {len(image_paths)} pages to images")
+        # Update task status to FAILED
+        run_async(update_task_status(
+            task_id,
+            TaskStatus.FAILED,
+            book_id,
+            TaskType.PDF_PARSE,
+            error_message=str(e)
+        ))
 
-        # Process each page with OCR
-        ocr_results = []
-        for i, image_path in enumerate(image_paths, 1):
-            self.update_state(
-                state="PROGRESS",
-                meta={
-                    "current": i,
-                    "total": total_pages,
-                    "status": f"OCR processing page {i}/{total_pages}"
-                }
-            )
+        # Update book status to failed
+        run_async(_update_book_status(book_id, "failed", 0))
 
-            # Extract text from image
-            extracted_texts = ocr_service.extract_text_from_image(
-                image_path,
-                confidence_threshold=0.6
-            )
+        raise
 
-            # Format for LLM
-            formatted_text = ocr_service.format_for_llm(extracted_texts)
+    logger.info(f"Starting OCR of book {book_id} in {len(page_tasks)} page range tasks")
 
-            ocr_results.append({
-                "page_number": i,
-                "image_path": image_path,
-                "extracted_texts": extracted_texts,
-                "formatted_text": formatted_text,
-                "text_count": len(extracted_texts)
-            })
+    # Raises Ignore, so it stays outside the try above
+    raise self.replace(chord(page_tasks, clean_ocr_data.s(book_id)))
 
-            logger.info(f"Processed page {i}/{total_pages}: {len(extracted_texts)} text blocks")
 
-        # Update book status
-        asyncio.run(_update_book_status(book_id, "ocr_completed", total_pages))
+@celery_app.task(bind=True, name="process_page_range")
+def process_page_range(
+    self,
+    book_id: int,
+    pdf_path: str,
+    first_page: int,
+    last_page: int,
+    total_pages: int,
+    parent_task_id: str
+) -> List[Dict[str, Any]]:
+    """
+    Extract text with OCR from a range of PDF pages.
 
-        # Update task status to COMPLETED
-        result = {
-            "book_id": book_id,
-            "total_pages": total_pages,
-            "total_text_blocks": sum(r["text_count"] for r in ocr_results),
-            "ocr_results": ocr_results
-        }
+    Args:
+        book_id: ID of the book
+        pdf_path: Path to the PDF file
+        first_page: First page to process (1-indexed)
+        last_page: Last page to process (1-indexed)
+        total_pages: Number of pages in the whole PDF
+        parent_task_id: ID of the process_pdf_book task, which progress is reported on
 
-        asyncio.run(_update_task_status(
-            task_id,
-            TaskStatus.COMPLETED,
-            book_id,
-            result=result
-        ))
+    Returns:
+        Reference to the saved list of OCR results per page (see save_task_artifact)
+    """
+    logger.info(f"Processing pages {first_page}-{last_page} of book {book_id}")
 
-        logger.info(f"Completed PDF processing for book {book_id}")
-        return result
+    try:
+        # Initialize services
+        pdf_service = get_pdf_service()
+        ocr_service = get_ocr_service(lang="ch")
+
+        # Render and OCR pages step by step in memory: several pages per OCR
+        # batch, one batch per OCR worker thread, and the next step rendered
+        # on a background thread while the current one is OCR'd
+        ocr_results = []
+        pages_per_step = OCR_BATCH_SIZE * ocr_service.max_workers
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf-render") as render_executor:
+            steps = _prefetch(
+                pdf_service.iter_pdf_arrays(pdf_path, pages_per_step, first_page, last_page),
+                render_executor
+            )
+            for step_first, page_images in steps:
+                step_last = step_first + len(page_images) - 1
+                batch_texts = ocr_service.extract_text_from_arrays(
+                    page_images,
+                    confidence_threshold=0.6,
+                    batch_size=OCR_BATCH_SIZE
+                )
+
+                # Ranges run in parallel, so the count is the book's, not this range's
+                self.update_state(
+                    task_id=parent_task_id,
+                    state="PROGRESS",
+                    meta={
+                        "current": _count_ocr_pages(parent_task_id, len(page_images), total_pages),
+                        "total": total_pages,
+                        "status": f"OCR processed pages {step_first}-{step_last}/{total_pages}"
+                    }
+                )
+                del page_images
+
+                for i, extracted_texts in enumerate(batch_texts, step_first):
+                    # Format for LLM
+                    formatted_text = ocr_service.format_for_llm(extracted_texts)
+
+                    ocr_results.append({
+                        "page_number": i,
+                        "extracted_texts": extracted_texts,
+                        "formatted_text": formatted_text,
+                        "text_count": len(extracted_texts)
+                    })
+
+                    logger.info("Processed page %d/%d: %d text blocks", i, total_pages, len(extracted_texts))
+
+        logger.info(f"Completed OCR for pages {first_page}-{last_page} of book {book_id}")
+        return save_task_artifact(self.request.id, ocr_results)
 
     except Exception as e:
-        logger.error(f"Error processing PDF for book {book_id}: {str(e)}")
+        logger.error(f"Error processing pages {first_page}-{last_page} of book {book_id}: {str(e)}")
 
-        # Update task status to FAILED
-        asyncio.run(_update_task_status(
-            task_id,
+        # The chord won't run clean_ocr_data (Celery fails its result, which
+        # is the parent's ID), so fail the book and the parent's row here
+        run_async(update_task_status(
+            parent_task_id,
             TaskStatus.FAILED,
             book_id,
+            TaskType.PDF_PARSE,
             error_message=str(e)
         ))
-
-        # Update book status to failed
-        asyncio.run(_update_book_status(book_id, "failed", 0))
+        run_async(_update_book_status(book_id, "failed", 0))
 
         raise
 
@@ -163,7 +226,7 @@ def process_single_page(
 
     try:
         # Initialize OCR service
-        ocr_service = get_ocr_service(lang="ch", use_gpu=False)
+        ocr_service = get_ocr_service(lang="ch")
 
         # Extract text from image
         extracted_texts = ocr_service.extract_text_from_image(
@@ -191,53 +254,40 @@ def process_single_page(
         raise
 
 
-async def _update_task_status(
-    task_id: str,
-    status: TaskStatus,
-    book_id: int,
-    result: Dict[str, Any] = None,
-    error_message: str = None
-):
-    """Update Celery task status in database."""
-    engine = create_async_engine(settings.DATABASE_URL)
-    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-
-    async with async_session() as session:
-        # Check if task exists
-        stmt = select(CeleryTask).where(CeleryTask.task_id == task_id)
-        result_obj = await session.execute(stmt)
-        task = result_obj.scalar_one_or_none()
-
-        if task:
-            # Update existing task
-            task.status = status
-            if result:
-                task.result = result
-            if error_message:
-                task.error_message = error_message
-        else:
-            # Create new task
-            task = CeleryTask(
-                task_id=task_id,
-                task_name="process_pdf_book",
-                status=status,
-                book_id=book_id,
-                result=result,
-                error_message=error_message
-            )
-            session.add(task)
+def _count_ocr_pages(parent_task_id: str, pages: int, total_pages: int) -> int:
+    """
+    Add a range's newly OCR'd pages to the book's count and return the total.
+
+    The ranges of a book run in parallel, so the count is kept in the result
+    backend's Redis under the parent task's ID rather than per task.
+    """
+    key = f"ocr-pages-done-{parent_task_id}"
+    client = celery_app.backend.client
+    done = client.incrby(key, pages)
+    client.expire(key, celery_app.conf.result_expires)
+    # Redelivered ranges count their pages twice
+    return min(done, total_pages)
 
-        await session.commit()
 
-    await engine.dispose()
+def _prefetch(iterator: Iterator[T], executor: Executor) -> Iterator[T]:
+    """
+    Yield items from an iterator while the next one is produced on the executor.
+
+    The iterator is only ever advanced by the executor, one step at a time,
+    so with a single-thread executor it stays on one thread.
+    """
+    future = executor.submit(next, iterator, None)
+    while True:
+        item: Optional[T] = future.result()
+        if item is None:
+            return
+        future = executor.submit(next, iterator, None)
+        yield item
 
 
 async def _update_book_status(book_id: int, status: str, total_pages: int):
     """Update book processing status in database."""
-    engine = create_async_engine(settings.DATABASE_URL)
-    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-
-    async with async_session() as session:
+    async with AsyncSessionLocal() as session:
         stmt = select(Book).where(Book.id == book_id)
         result = await session.execute(stmt)
         book = result.scalar_one_or_none()
@@ -247,5 +297,3 @@ async def _update_book_status(book_id: int, status: str, total_pages: int):
             if total_pages > 0:
                 book.total_pages = total_pages
             await session.commit()
-
-    await engine.dispose()
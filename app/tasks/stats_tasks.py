@@ -0,0 +1,24 @@
+"""
+Celery tasks for maintaining pre-aggregated study statistics.
+"""
+import logging
+from sqlalchemy import text
+
+from app.tasks import async_task, celery_app
+from app.core.database import engine
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="refresh_study_stats", ignore_result=True)
+@async_task
+async def refresh_study_stats() -> None:
+    """
+    Refresh the user_study_stats_mv materialized view.
+
+    Runs on the celery beat schedule. CONCURRENTLY keeps the view readable
+    by the stats endpoint while it is rebuilt.
+    """
+    async with engine.begin() as conn:
+        await conn.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY user_study_stats_mv"))
+    logger.info("Refreshed user_study_stats_mv")
@@ -1,7 +1,10 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from app.core.config import settings
 from app.core.database import init_db
+from app.tasks import release_task_producer
+from app.services.ai_service import close_ai_service
 from app.api.endpoints import auth, study, admin
 
 app = FastAPI(
@@ -10,6 +13,7 @@ app = FastAPI(
     description="Smart Vocab - 智能词汇学习平台",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
@@ -30,6 +34,12 @@ async def startup_event():
     await init_db()
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    release_task_producer()
+    await close_ai_service()
+
+
 @app.get("/")
 async def root():
     return {
@@ -50,4 +60,4 @@ async def health_check():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True, loop="uvloop")
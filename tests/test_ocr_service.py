@@ -0,0 +1,65 @@
+"""
+Tests for OCRService batch handling.
+
+The PaddleOCR pipeline stages (detector, recognizer) are stubbed so no
+models are loaded; PaddleOCR's own box sorting and line cropping are real.
+"""
+from types import SimpleNamespace
+
+import pytest
+
+np = pytest.importorskip("numpy")
+paddleocr = pytest.importorskip("paddleocr")
+
+from app.services import ocr_service
+from app.services.ocr_service import OCRService
+
+BOX = np.array([[0, 0], [40, 0], [40, 10], [0, 10]], dtype=np.float32)
+
+
+class StubPaddleOCR(paddleocr.PaddleOCR):
+    """PaddleOCR with stub det/rec stages; each page's pixels hold its index."""
+
+    def __init__(self, **kwargs):
+        # Skip model loading; set what TextSystem would
+        self.use_angle_cls = kwargs.get("use_angle_cls", False)
+        self.drop_score = 0.5
+        self.args = SimpleNamespace(det_box_type="quad")
+        self.rec_calls = []
+
+    def text_detector(self, img):
+        return np.array([BOX]), 0.0
+
+    def text_recognizer(self, img_list):
+        self.rec_calls.append(len(img_list))
+        return [(f"page-{int(crop[0, 0, 0])}", 0.99) for crop in img_list], 0.0
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(ocr_service, "PaddleOCR", StubPaddleOCR)
+    return OCRService(max_workers=1, cache_size=0, warmup=False, roi_crop=False)
+
+
+def _pages(count):
+    return [np.full((32, 64, 3), i, dtype=np.uint8) for i in range(count)]
+
+
+def test_ocr_images_recognizes_all_pages_in_one_call(service):
+    results = service._ocr_images(service.ocr, _pages(3), confidence_threshold=0.5)
+
+    assert [[block["text"] for block in page] for page in results] == [["page-0"], ["page-1"], ["page-2"]]
+    assert service.ocr.rec_calls == [3]
+
+
+def test_ocr_images_does_not_call_ocr_with_a_list(service, monkeypatch):
+    # PaddleOCR.ocr() exits the process when given a list with det=True
+    monkeypatch.setattr(service.ocr, "ocr", lambda *args, **kwargs: pytest.fail("ocr() called"), raising=False)
+
+    service._ocr_images(service.ocr, _pages(2), confidence_threshold=0.5)
+
+
+def test_extract_text_from_arrays_keeps_page_order(service):
+    results = service.extract_text_from_arrays(_pages(5), confidence_threshold=0.5, batch_size=2)
+
+    assert [page[0]["text"] for page in results] == [f"page-{i}" for i in range(5)]